@@ -0,0 +1,73 @@
+"""
+Agency Index.
+NewsItem.agency holds a comma-joined list ("LTA, MOT"), which SQL can't filter
+on exactly. `item_agency` keeps one (item_id, agency) row per agency so
+/news?agency=LTA is an indexed lookup that also matches multi-agency items.
+Keys are lower-cased: stored tags mix "MOM" / "mom" and "EnterpriseSG" / "ENTERPRISESG".
+Rows are written with the item: at ingest, POST /items and PATCH /items.
+Items written by other tools are picked up by backfill() at startup;
+`python agency_index.py` rebuilds the whole index (e.g. after bulk re-tagging).
+"""
+from typing import Iterable, List, Optional
+
+from sqlalchemy import exists
+from sqlmodel import Session, select, delete
+
+from database import engine
+from models import ItemAgency, NewsItem
+import data_version
+
+
+def split_agencies(agency: Optional[str]) -> List[str]:
+    """"LTA, MOT" -> ["lta", "mot"] (index keys)."""
+    return list(dict.fromkeys(a.strip().lower() for a in (agency or "").split(",") if a.strip()))
+
+
+def set_agencies(session: Session, item_id: int, agency: Optional[str]):
+    """Replaces the index rows of one item (in the caller's transaction)."""
+    session.exec(delete(ItemAgency).where(ItemAgency.item_id == item_id))
+    session.add_all(ItemAgency(item_id=item_id, agency=a) for a in split_agencies(agency))
+
+
+def index_items(session: Session, item_ids: Iterable[int]):
+    """Indexes freshly inserted items (in the caller's transaction)."""
+    item_ids = list(item_ids)
+    if not item_ids:
+        return
+    rows = session.exec(select(NewsItem.id, NewsItem.agency).where(NewsItem.id.in_(item_ids))).all()
+    session.exec(delete(ItemAgency).where(ItemAgency.item_id.in_(item_ids)))
+    session.add_all(ItemAgency(item_id=item_id, agency=a) for item_id, agency in rows for a in split_agencies(agency))
+
+
+def has_agency(agency: str):
+    """WHERE clause for NewsItem queries: the item lists this agency."""
+    return exists().where(ItemAgency.item_id == NewsItem.id, ItemAgency.agency == agency.strip().lower())
+
+
+def backfill(batch_size: int = 1000) -> int:
+    """Indexes items that have an agency string but no index rows yet."""
+    with Session(engine) as session:
+        ids = session.exec(
+            select(NewsItem.id).where(NewsItem.agency != None, NewsItem.agency != "",
+                                      ~exists().where(ItemAgency.item_id == NewsItem.id))
+        ).all()
+        for start in range(0, len(ids), batch_size):
+            index_items(session, ids[start:start + batch_size])
+        if ids:
+            data_version.bump(session)
+        session.commit()
+    if ids:
+        print(f"Indexed agencies of {len(ids)} items")
+    return len(ids)
+
+
+def rebuild() -> int:
+    with Session(engine) as session:
+        session.exec(delete(ItemAgency))
+        data_version.bump(session)
+        session.commit()
+    return backfill()
+
+
+if __name__ == "__main__":
+    rebuild()
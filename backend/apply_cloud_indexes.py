@@ -29,7 +29,14 @@ def apply_indexes():
         except Exception as e:
             print(f"Skipped (or error): {e}")
 
-        # 4. Search Optimization (Gin Index for FTS if using tsvector)
+        # 4. Feed order (keyset pagination of /news on published_at, id)
+        try:
+            print("Creating Index: ix_newsitem_feed_order...")
+            session.exec(text("CREATE INDEX IF NOT EXISTS ix_newsitem_feed_order ON newsitem (is_hidden, published_at, id);"))
+        except Exception as e:
+            print(f"Skipped (or error): {e}")
+
+        # 5. Search Optimization (Gin Index for FTS if using tsvector)
         # For simple ILIKE search, basic indexes don't help much unless using pg_trgm
         # But we will rely on Postgres 'websearch_to_tsquery' if available, which uses to_tsvector on the fly
         # Ideally we create a generated column, but specialized indexes are complex to manage via raw SQL if not superuser.
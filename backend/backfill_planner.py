@@ -0,0 +1,108 @@
+"""
+Incremental Backfill Planner.
+Remembers when each backfill query last succeeded so hourly scans only ask
+Google News for the last day instead of re-pulling 30 days every time.
+1. First run (or daily / on demand): full `when:30d` sweep
+2. Otherwise: narrow window covering the time since the last success
+3. Queries that keep returning no new URLs are pushed down (backed off)
+"""
+import hashlib
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlmodel import Session, select
+
+from database import engine
+from models import BackfillQueryState
+
+FULL_WINDOW_DAYS = 30
+FULL_SWEEP_INTERVAL = timedelta(days=1)
+EMPTY_STREAK_BEFORE_BACKOFF = 3
+MAX_BACKOFF = timedelta(hours=24)
+
+
+@dataclass
+class PlannedQuery:
+    key: str
+    query: str # Without time window
+    window_days: int
+    is_full: bool
+
+    @property
+    def full_query(self) -> str:
+        return f"{self.query} when:{self.window_days}d"
+
+
+def query_key(query: str) -> str:
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+
+
+def plan(queries: List[str], force_full: bool = False) -> List[PlannedQuery]:
+    """Decide window per query; drops backed-off queries and orders the rest by yield."""
+    keys = {query_key(q): q for q in queries}
+    with Session(engine) as session:
+        states = {s.query_key: s for s in session.exec(
+            select(BackfillQueryState).where(BackfillQueryState.query_key.in_(list(keys)))
+        ).all()}
+
+    now = datetime.utcnow()
+    planned = []
+    for key, query in keys.items():
+        state = states.get(key)
+        is_full = (
+            force_full
+            or state is None
+            or state.last_success_at is None
+            or state.last_full_at is None
+            or now - state.last_full_at >= FULL_SWEEP_INTERVAL
+        )
+        if is_full:
+            planned.append((PlannedQuery(key, query, FULL_WINDOW_DAYS, True), state))
+            continue
+
+        # Push down queries that never bring anything new
+        if state.next_run_at and state.next_run_at > now:
+            continue
+
+        # Cover the gap since the last success (e.g. after downtime), min 1 day
+        gap_days = (now - state.last_success_at).total_seconds() / 86400
+        window = min(FULL_WINDOW_DAYS, max(1, math.ceil(gap_days)))
+        planned.append((PlannedQuery(key, query, window, False), state))
+
+    def yield_rate(pair):
+        state = pair[1]
+        return state.new_urls / state.runs if state and state.runs else float("inf")
+
+    planned.sort(key=yield_rate, reverse=True)
+    full = sum(1 for p, _ in planned if p.is_full)
+    print(f"Backfill plan: {len(planned)}/{len(keys)} queries ({full} full sweep)")
+    return [p for p, _ in planned]
+
+
+def record(results: Dict[str, int], planned: List[PlannedQuery]):
+    """Store outcome of planned queries that succeeded: {query key: new URL count}."""
+    if not results:
+        return
+    by_key = {p.key: p for p in planned}
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        for key, new_count in results.items():
+            p = by_key[key]
+            state = session.get(BackfillQueryState, key) or BackfillQueryState(query_key=key, query=p.query)
+            state.last_success_at = now
+            if p.is_full:
+                state.last_full_at = now
+            state.runs += 1
+            state.new_urls += new_count
+            if new_count:
+                state.empty_streak = 0
+                state.next_run_at = None
+            else:
+                state.empty_streak += 1
+                if state.empty_streak >= EMPTY_STREAK_BEFORE_BACKOFF:
+                    backoff = timedelta(hours=2 ** (state.empty_streak - EMPTY_STREAK_BEFORE_BACKOFF))
+                    state.next_run_at = now + min(backoff, MAX_BACKOFF)
+            session.add(state)
+        session.commit()
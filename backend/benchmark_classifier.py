@@ -0,0 +1,66 @@
+"""
+Benchmark: classify_sector keyword scoring, per-keyword regex vs. the precompiled matcher.
+Runs over the stored news items (title + summary) and checks both give the same sectors.
+Usage: python benchmark_classifier.py [rounds]
+"""
+import re
+import sys
+import time
+
+from sqlmodel import Session, select
+
+from database import engine
+from models import NewsItem
+from scraper import KEYWORD_MAP, classify_sector, sector_matcher
+
+
+def legacy_scores(text: str) -> dict:
+    # The original implementation: one regex per keyword per call
+    text_lower = text.lower()
+    scores = {}
+    for sector, keywords in KEYWORD_MAP.items():
+        score = 0
+        for kw in keywords:
+            if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
+                score += 1
+        if score > 0:
+            scores[sector] = score
+    return scores
+
+
+def matcher_scores(text: str) -> dict:
+    return sector_matcher().count(text.lower())
+
+
+def run(fn, texts, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return rounds * len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with Session(engine) as session:
+        rows = session.exec(select(NewsItem.title, NewsItem.summary)).all()
+    texts = [f"{title} {summary or ''}" for title, summary in rows]
+    if not texts:
+        print("No news items in the database.")
+        return
+
+    mismatches = [t for t in texts if legacy_scores(t) != matcher_scores(t)]
+    print(f"{len(texts)} items, {len(mismatches)} mismatches")
+    for t in mismatches[:5]:
+        print(f"  MISMATCH: {t[:80]}")
+
+    sector_matcher() # Build outside the timed loop
+    before = run(legacy_scores, texts, rounds)
+    after = run(matcher_scores, texts, rounds)
+    print(f"Keyword scoring  before: {before:,.0f} items/sec  after: {after:,.0f} items/sec  ({after / before:.1f}x)")
+    full = run(classify_sector, texts, rounds)
+    print(f"classify_sector (end to end): {full:,.0f} items/sec")
+
+
+if __name__ == "__main__":
+    main()
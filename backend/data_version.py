@@ -0,0 +1,81 @@
+"""
+Data Version.
+Counters for "has anything the read endpoints show changed?", one row per scope:
+- "data": items themselves (ingest batches, item edits, hide / restore, save toggles,
+  index rebuilds); keys /news, /brief and /stats
+- "stats": counter corrections by stats.rebuild(); keys /stats only, so an hourly
+  rebuild that fixed a counter doesn't throw away cached /news pages
+1. bump(session, scope) runs inside the write's own transaction
+2. current(scope) reads every scope with one primary-key lookup, kept per process
+   for VERSION_TTL
+3. A commit that bumped drops this process's copy at once, so its own writes are
+   visible immediately; other processes (e.g. worker.py) within VERSION_TTL
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from database import engine, dialect_insert
+from models import DataVersion
+
+SCOPES = {"data": 1, "stats": 2} # Scope -> data_version row id
+VERSION_TTL = float(os.environ.get("DATA_VERSION_TTL", "2")) # Seconds
+
+_cached: Optional[Dict[int, int]] = None
+_cached_at = 0.0
+_generation = 0 # Bumped by invalidate(); a read that started earlier is not kept
+_lock = threading.Lock()
+
+
+def bump(session: Session, scope: str = "data"):
+    """Increments the scope's version in the caller's transaction. Commit after."""
+    table = DataVersion.__table__
+    now = datetime.utcnow()
+    stmt = dialect_insert(table).values(id=SCOPES[scope], version=1, changed_at=now)
+    session.exec(stmt.on_conflict_do_update(
+        index_elements=["id"], set_={"version": table.c.version + 1, "changed_at": now},
+    ))
+    session.info["data_version_bumped"] = True
+
+
+def invalidate():
+    global _cached, _generation
+    with _lock:
+        _cached = None
+        _generation += 1
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    if session.info.pop("data_version_bumped", False):
+        invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("data_version_bumped", None)
+
+
+def _versions() -> Dict[int, int]:
+    global _cached, _cached_at
+    with _lock:
+        if _cached is not None and time.monotonic() - _cached_at < VERSION_TTL:
+            return _cached
+        generation = _generation
+    with Session(engine) as session:
+        rows = session.exec(select(DataVersion.id, DataVersion.version)
+                            .where(DataVersion.id.in_(list(SCOPES.values())))).all()
+        value = dict(rows)
+    with _lock:
+        if generation == _generation:
+            _cached, _cached_at = value, time.monotonic()
+    return value
+
+
+def current(scope: str = "data") -> int:
+    return _versions().get(SCOPES[scope], 0)
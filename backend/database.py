@@ -1,4 +1,6 @@
 import os
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlmodel import SQLModel, create_engine, Session
 
 # Check for environment variable (Production)
@@ -20,6 +22,48 @@ else:
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    add_missing_columns()
+    add_missing_indexes()
+
+def add_missing_columns(bind=None):
+    # create_all() doesn't alter existing tables: add model columns older databases lack.
+    # Added as nullable; callers backfill them (e.g. ingest.backfill_url_hashes)
+    bind = bind or engine
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=bind.dialect)
+                print(f"Adding column {table.name}.{column.name} ({col_type})")
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+
+def add_missing_indexes(bind=None):
+    # Same for indexes declared on models after their table was created
+    bind = bind or engine
+    inspector = inspect(bind)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {i["name"] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                print(f"Creating index {index.name}")
+                try:
+                    index.create(bind)
+                except Exception as e:
+                    # e.g. a unique index over rows that still need backfilling
+                    print(f"Could not create index {index.name}: {e}")
+
+def dialect_insert(table):
+    # Both dialects support INSERT ... ON CONFLICT DO UPDATE ... RETURNING (SQLite >= 3.35)
+    if engine.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
 
 def get_session():
     with Session(engine) as session:
@@ -0,0 +1,215 @@
+"""
+Concurrent Feed Fetcher.
+Downloads every RSS / Google News URL of a scan at the same time instead of
+one blocking feedparser.parse(url) after another.
+1. Per-host concurrency limit (be polite to news.google.com)
+2. Per-request timeout
+3. Deadline for the whole run (slow feeds are dropped, not waited on)
+4. Conditional GET (ETag / Last-Modified / body hash) so unchanged feeds are not re-parsed
+"""
+import asyncio
+import hashlib
+import queue
+import re
+import threading
+import time
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import feedparser
+import httpx
+from sqlmodel import Session, select
+
+from database import engine
+from models import FeedValidator
+
+# Set User Agent to avoid blocking on Cloud (Render)
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+PER_HOST_LIMIT = 4       # Max in-flight requests per host
+REQUEST_TIMEOUT = 10.0   # Seconds per request
+RUN_DEADLINE = 45.0      # Seconds for the whole batch
+
+# Google News stamps every response with a fresh build date; ignore it when hashing
+VOLATILE_TAGS = re.compile(rb"<lastBuildDate>.*?</lastBuildDate>", re.DOTALL)
+
+
+@dataclass
+class FeedResult:
+    url: str
+    feed: Optional[feedparser.FeedParserDict] = None
+    status: Optional[int] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    bytes: int = 0
+    not_modified: bool = False
+    # Validators to persist once the scan has processed this feed
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.feed is not None or self.not_modified
+
+    @property
+    def entries(self) -> list:
+        return self.feed.entries if self.feed is not None else []
+
+
+def body_hash(content: bytes) -> str:
+    return hashlib.sha256(VOLATILE_TAGS.sub(b"", content)).hexdigest()
+
+
+def load_validators(urls: List[str]) -> Dict[str, FeedValidator]:
+    with Session(engine) as session:
+        rows = session.exec(select(FeedValidator).where(FeedValidator.url.in_(urls))).all()
+        return {row.url: row for row in rows}
+
+
+def save_validators(results: List[FeedResult]):
+    """Persist validators of successfully fetched feeds. Call after the scan processed them."""
+    fresh = [r for r in results if r.feed is not None and r.body_hash]
+    if not fresh:
+        return
+    with Session(engine) as session:
+        for r in fresh:
+            row = session.get(FeedValidator, r.url) or FeedValidator(url=r.url)
+            row.etag = r.etag
+            row.last_modified = r.last_modified
+            row.body_hash = r.body_hash
+            row.checked_at = datetime.utcnow()
+            session.add(row)
+        session.commit()
+
+
+async def _fetch_one(client: httpx.AsyncClient, url: str, host_limits: Dict[str, asyncio.Semaphore],
+                     validator: Optional[FeedValidator] = None) -> FeedResult:
+    host = urlsplit(url).netloc
+    if host not in host_limits:
+        host_limits[host] = asyncio.Semaphore(PER_HOST_LIMIT)
+
+    headers = {}
+    if validator:
+        if validator.etag:
+            headers["If-None-Match"] = validator.etag
+        if validator.last_modified:
+            headers["If-Modified-Since"] = validator.last_modified
+
+    result = FeedResult(url=url)
+    started = time.perf_counter()
+    async with host_limits[host]:
+        try:
+            response = await client.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            result.status = response.status_code
+            result.bytes = len(response.content)
+            if response.status_code == 304:
+                result.not_modified = True
+            elif response.status_code != 200:
+                result.error = f"HTTP {response.status_code}"
+            else:
+                result.etag = response.headers.get("ETag")
+                result.last_modified = response.headers.get("Last-Modified")
+                result.body_hash = body_hash(response.content)
+                if validator and validator.body_hash == result.body_hash:
+                    # Server ignored the validators but nothing changed
+                    result.not_modified = True
+                else:
+                    # Parse off the event loop so other downloads keep flowing
+                    result.feed = await asyncio.to_thread(feedparser.parse, response.content)
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def fetch_feeds_async(urls: List[str], deadline: float = RUN_DEADLINE,
+                            validators: Optional[Dict[str, FeedValidator]] = None,
+                            on_result: Optional[Callable[[FeedResult], None]] = None) -> Dict[str, FeedResult]:
+    """Fetch all URLs; `on_result` is called with each FeedResult as soon as it is ready."""
+    validators = validators or {}
+    unique_urls = list(dict.fromkeys(urls))
+    results = {url: FeedResult(url=url, error="deadline exceeded", elapsed=deadline) for url in unique_urls}
+    if not unique_urls:
+        return results
+
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+    headers = {"User-Agent": USER_AGENT}
+
+    async def fetch(client, url):
+        result = await _fetch_one(client, url, host_limits, validators.get(url))
+        if on_result:
+            on_result(result)
+        return result
+
+    async with httpx.AsyncClient(headers=headers, follow_redirects=True) as client:
+        tasks = {asyncio.create_task(fetch(client, url)): url for url in unique_urls}
+        done, pending = await asyncio.wait(tasks.keys(), timeout=deadline)
+        for task in pending:
+            task.cancel()
+            if on_result:
+                on_result(results[tasks[task]])
+        for task in done:
+            results[tasks[task]] = task.result()
+    return results
+
+
+def _load_validators_safe(urls: List[str]) -> Dict[str, FeedValidator]:
+    try:
+        return load_validators(list(dict.fromkeys(urls)))
+    except Exception as e:
+        print(f"Could not load feed validators: {e}")
+        return {}
+
+
+def _log_summary(results: List[FeedResult], started: float):
+    failed = [r for r in results if not r.ok]
+    unchanged = [r for r in results if r.not_modified]
+    print(f"Fetched {len(results)} feeds in {time.perf_counter() - started:.1f}s "
+          f"({len(unchanged)} unchanged, {len(failed)} failed)")
+    for r in failed:
+        print(f"  [Feed Error] {r.url[:80]}: {r.error}")
+
+
+def iter_feeds(urls: List[str], deadline: float = RUN_DEADLINE, conditional: bool = False) -> Iterator[FeedResult]:
+    """
+    Fetch all feeds concurrently, yielding each FeedResult as soon as it is parsed
+    (completion order). The event loop runs in a helper thread.
+    With conditional=True, stored validators are sent and unchanged feeds come back
+    with not_modified=True and no parsed feed. Call save_validators() afterwards.
+    """
+    started = time.perf_counter()
+    validators = _load_validators_safe(urls) if conditional else {}
+    ready: "queue.Queue[Optional[FeedResult]]" = queue.Queue()
+
+    def run():
+        try:
+            asyncio.run(fetch_feeds_async(urls, deadline, validators, on_result=ready.put))
+        except Exception as e:
+            print(f"Feed fetcher crashed: {e}")
+        finally:
+            ready.put(None)
+
+    threading.Thread(target=run, name="feed-fetcher", daemon=True).start()
+    results = []
+    while True:
+        result = ready.get()
+        if result is None:
+            break
+        results.append(result)
+        yield result
+    _log_summary(results, started)
+
+
+def fetch_feeds(urls: List[str], deadline: float = RUN_DEADLINE, conditional: bool = False) -> Dict[str, FeedResult]:
+    """
+    Fetch and parse all feeds concurrently. Returns {url: FeedResult}.
+    Safe to call from sync code (scheduler thread / FastAPI threadpool).
+    """
+    started = time.perf_counter()
+    validators = _load_validators_safe(urls) if conditional else {}
+    results = asyncio.run(fetch_feeds_async(urls, deadline, validators))
+    _log_summary(list(results.values()), started)
+    return results
@@ -0,0 +1,245 @@
+"""
+Streaming Ingestion Pipeline.
+Overlaps the three phases of a scan instead of running them back to back:
+1. Fetch stage: scraper.iter_news() yields each source's items as soon as its feed is parsed
+2. Writer stage: writes items in micro-batches, so new rows show up in /news within seconds
+3. Embedding stage: embeds newly inserted IDs while later feeds are still in flight
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, text
+from sqlmodel import Session, select, update
+
+from database import engine, dialect_insert
+from models import NewsItem
+import scraper
+import agency_index
+import data_version
+import near_dup
+import seen_filter
+import stats
+import url_canon
+import vector_engine
+
+BATCH_SIZE = 20       # Items per DB commit
+FLUSH_INTERVAL = 1.0  # Max seconds an item waits in a partial batch
+
+_DONE = object()
+
+
+@dataclass
+class ScanResult:
+    scraped: int = 0
+    added: int = 0
+    updated: int = 0
+    merged: int = 0 # Near-duplicates hidden at ingest
+    embedded: int = 0
+    errors: List[str] = field(default_factory=list)
+    write_failed: bool = False # A batch was not written; embed errors don't count
+    fetch_stats: Dict = field(default_factory=dict)
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    stage: str = "starting" # fetching -> writing -> embedding -> done
+
+    def progress(self) -> Dict:
+        """Snapshot for status endpoints (safe to call from another thread)."""
+        return {
+            "stage": self.stage,
+            "feeds_done": self.fetch_stats.get("feeds_done", 0),
+            "feeds_total": self.fetch_stats.get("feeds_total"),
+            "scraped": self.scraped, "added": self.added, "updated": self.updated,
+            "merged": self.merged, "embedded": self.embedded, "errors": len(self.errors),
+        }
+
+
+def backfill_url_hashes():
+    """
+    Fill url_hash for rows stored before the column existed and make sure the unique
+    index exists. Later copies of an already-hashed URL keep a NULL hash (the scan
+    matches the first one).
+    """
+    with Session(engine) as session:
+        rows = session.exec(
+            select(NewsItem.id, NewsItem.url).where(NewsItem.url_hash == None).order_by(NewsItem.id)
+        ).all()
+        if rows:
+            taken = set(session.exec(select(NewsItem.url_hash).where(NewsItem.url_hash != None)).all())
+            updates = []
+            for item_id, url in rows:
+                key = url_canon.url_hash(url)
+                if key not in taken:
+                    taken.add(key)
+                    updates.append({"id": item_id, "url_hash": key})
+            if updates:
+                session.exec(update(NewsItem), params=updates)
+                session.commit()
+                print(f"Backfilled url_hash for {len(updates)} items ({len(rows) - len(updates)} duplicates left unhashed)")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_newsitem_url_hash ON newsitem (url_hash)"))
+
+
+def upsert_items(session: Session, items: List[NewsItem]) -> Tuple[List[int], int]:
+    """
+    One INSERT ... ON CONFLICT (url_hash) DO UPDATE ... RETURNING id for the batch.
+    Known URLs only get their impact_rating refreshed, and never if the item was edited
+    by hand (is_manual). Items must have url_hash set and be unique by it.
+    Returns (IDs of inserted items, number of updated items).
+    """
+    table = NewsItem.__table__
+    columns = [c.name for c in table.columns if c.name != "id"]
+    rows = [{name: getattr(item, name) for name in columns} for item in items]
+    hashes = [row["url_hash"] for row in rows]
+    # Tells inserts from updates in RETURNING (works on both dialects, unlike xmax)
+    known = set(session.exec(select(NewsItem.url_hash).where(NewsItem.url_hash.in_(hashes))).all())
+
+    stmt = dialect_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.url_hash],
+        set_={"impact_rating": stmt.excluded.impact_rating},
+        # Rows failing this are left alone and not returned
+        where=and_(table.c.is_manual.is_not(True), table.c.impact_rating != stmt.excluded.impact_rating),
+    ).returning(table.c.id, table.c.url_hash)
+    returned = session.execute(stmt).all()
+
+    new_ids = [row.id for row in returned if row.url_hash not in known]
+    return new_ids, len(returned) - len(new_ids)
+
+
+def write_batch(batch: List[NewsItem], run_keys: set, result: ScanResult) -> List[int]:
+    """Insert new items / refresh impact of known ones. Returns IDs of inserted items that stay visible."""
+    # Google News redirects -> publisher URL, tracking params stripped (cached across runs)
+    canonical = url_canon.canonicalize_many(item.url for item in batch)
+    items = []
+    for item in batch:
+        item.url = canonical.get(item.url, item.url)
+        item.url_hash = url_canon.url_hash(item.url)
+        if item.url_hash in run_keys:
+            continue # Same article from another feed of this scan
+        run_keys.add(item.url_hash)
+        items.append(item)
+    if not items:
+        return []
+
+    with Session(engine) as session:
+        # Dashboard counters move with the batch, in the same transaction
+        with stats.tracking(session, NewsItem.url_hash.in_([item.url_hash for item in items])):
+            new_ids, updated = upsert_items(session, items)
+            agency_index.index_items(session, new_ids)
+            # Same story from another outlet: merged into the existing item and hidden
+            merged = near_dup.check_new(session, new_ids)
+        data_version.bump(session)
+        session.commit()
+
+    result.added += len(new_ids)
+    result.updated += updated
+    result.merged += len(merged)
+    return [i for i in new_ids if i not in merged]
+
+
+def _writer(items_q: queue.Queue, embed_q: queue.Queue, result: ScanResult):
+    run_keys = set()
+    batch: List[NewsItem] = []
+    batch_started = time.monotonic()
+
+    def flush():
+        try:
+            new_ids = write_batch(batch, run_keys, result)
+            if new_ids:
+                embed_q.put(new_ids)
+        except Exception as e:
+            print(f"Failed to write batch of {len(batch)} items: {e}")
+            result.errors.append(f"write: {e}")
+            result.write_failed = True
+        batch.clear()
+
+    while True:
+        try:
+            items = items_q.get(timeout=FLUSH_INTERVAL)
+        except queue.Empty:
+            items = None
+        if items is _DONE:
+            break
+        if items:
+            if not batch:
+                batch_started = time.monotonic()
+            batch.extend(items)
+        if batch and (len(batch) >= BATCH_SIZE or time.monotonic() - batch_started >= FLUSH_INTERVAL):
+            flush()
+
+    if batch:
+        flush()
+    embed_q.put(_DONE)
+
+
+def _embedder(embed_q: queue.Queue, result: ScanResult):
+    while True:
+        ids = embed_q.get()
+        if ids is _DONE:
+            break
+        try:
+            result.embedded += vector_engine.index_ids(ids)
+        except Exception as e:
+            print(f"Embedding stage failed for {len(ids)} items: {e}")
+            result.errors.append(f"embed: {e}")
+
+
+def run_scan(full_backfill: bool = False, sources: Optional[List[str]] = None,
+             on_progress: Optional[Callable[[ScanResult], None]] = None) -> ScanResult:
+    """
+    Runs one scan through the fetch -> DB -> embeddings pipeline.
+    sources limits it to some scraper.scan_source_names(); on_progress(result) is called
+    after every fetched batch and stage change.
+    """
+    result = ScanResult()
+    items_q: queue.Queue = queue.Queue()
+    embed_q: queue.Queue = queue.Queue()
+    writer = threading.Thread(target=_writer, args=(items_q, embed_q, result), name="ingest-writer", daemon=True)
+    embedder = threading.Thread(target=_embedder, args=(embed_q, result), name="ingest-embedder", daemon=True)
+    writer.start()
+    embedder.start()
+
+    def set_stage(stage: str):
+        result.stage = stage
+        if on_progress:
+            on_progress(result)
+
+    fetch_ok = False
+    deferred = {} # Feed validators, backfill progress: saved only once the items are written
+    try:
+        set_stage("fetching")
+        for items in scraper.iter_news(result.fetch_stats, full_backfill, sources, deferred):
+            result.scraped += len(items)
+            items_q.put(items)
+            if on_progress:
+                on_progress(result)
+        fetch_ok = True
+    except Exception as e:
+        print(f"Scan fetch stage failed: {e}")
+        result.errors.append(f"fetch: {e}")
+    finally:
+        items_q.put(_DONE)
+        set_stage("writing")
+        writer.join()
+        set_stage("embedding")
+        embedder.join()
+
+    # Entries of this scan are durable now; later scans can skip them. After a failed
+    # write the validators and backfill progress are dropped too, so those feeds are
+    # fetched and parsed again and the backfill window still covers the lost items.
+    # Embedding failures don't count: the rows are committed, only vectors are missing
+    if fetch_ok and not result.write_failed:
+        seen_filter.commit()
+        try:
+            scraper.commit_deferred(deferred)
+        except Exception as e:
+            print(f"Failed to save scan state: {e}")
+    else:
+        seen_filter.reset_pending()
+    result.finished_at = datetime.utcnow()
+    set_stage("done")
+    return result
@@ -0,0 +1,207 @@
+"""
+DB-Backed Job Queue.
+Moves scrapes out of the web process: the API only inserts `job` rows and
+worker.py claims and runs them.
+1. Postgres: claimed with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+   workers take different jobs without blocking each other
+2. SQLite: claimed with a compare-and-set UPDATE (status='queued' -> 'running');
+   SQLite serializes writers, so exactly one worker wins each row
+3. Running jobs send heartbeats; a job whose worker died is re-queued after
+   STALE_AFTER (at most MAX_ATTEMPTS times)
+A dedupe_key allows one *queued* job per key (released on claim), which lets
+scan_coordinator fold repeated scan requests into a single follow-up job. Kinds
+registered with register_pending() get that key back when a stale job is re-queued,
+or are folded into the job already holding it.
+Kinds in EXCLUSIVE_KINDS never run twice at once, however many workers poll:
+the claiming UPDATE re-checks that none of the kind is running, and on Postgres
+claims serialize on a per-kind advisory lock (SKIP LOCKED hides in-flight claims).
+"""
+import hashlib
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import exists, or_, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select, update, delete
+
+from database import engine
+from models import Job
+
+STALE_AFTER = timedelta(minutes=10) # No heartbeat for this long -> worker presumed dead
+MAX_ATTEMPTS = 3
+KEEP_FINISHED = timedelta(days=7)
+EXCLUSIVE_KINDS = {"scrape"} # One at a time: overlapping scans double traffic and race on URLs
+
+# kind -> (dedupe_key of its queued job, merge(queued_params, stale_params) -> params)
+_pending_keys: Dict[str, Tuple[str, Callable[[Dict, Dict], Dict]]] = {}
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(kind: str, params: Optional[Dict] = None, dedupe_key: Optional[str] = None) -> int:
+    """Adds a job and returns its ID; with a dedupe_key that already exists, returns that job's ID."""
+    with Session(engine) as session:
+        job = Job(kind=kind, params=params or {}, dedupe_key=dedupe_key)
+        session.add(job)
+        try:
+            session.commit()
+            return job.id
+        except IntegrityError:
+            session.rollback()
+            return session.exec(select(Job.id).where(Job.dedupe_key == dedupe_key)).one()
+
+
+def claim_slot(key: str) -> bool:
+    """
+    True for the first caller per key, e.g. one hourly scrape per clock hour across
+    several schedulers. Stored as a finished "slot" job, pruned like other jobs.
+    """
+    with Session(engine) as session:
+        session.add(Job(kind="slot", status="done", dedupe_key=key, finished_at=datetime.utcnow()))
+        try:
+            session.commit()
+            return True
+        except IntegrityError:
+            session.rollback()
+            return False
+
+
+def register_pending(kind: str, dedupe_key: str, merge: Callable[[Dict, Dict], Dict]):
+    """Stale `kind` jobs are re-queued under dedupe_key, or merged into the job holding it."""
+    _pending_keys[kind] = (dedupe_key, merge)
+
+
+def _requeue_keyed(session: Session, job: Job, stale) -> bool:
+    dedupe_key, merge = _pending_keys[job.kind]
+    while True:
+        pending = session.exec(select(Job).where(Job.dedupe_key == dedupe_key)).first()
+        if pending is None:
+            try:
+                with session.begin_nested():
+                    return session.exec(update(Job).where(Job.id == job.id, stale).values(
+                        status="queued", worker=None, dedupe_key=dedupe_key)).rowcount > 0
+            except IntegrityError:
+                continue # Queued by someone else meanwhile: merge into that one
+        folded = session.exec(
+            update(Job).where(Job.id == pending.id, Job.status == "queued").values(
+                params=merge(pending.params or {}, job.params or {}),
+                attempts=max(pending.attempts, job.attempts))
+        ).rowcount
+        if not folded:
+            continue # Claimed meanwhile, which released the key
+        return session.exec(update(Job).where(Job.id == job.id, stale).values(
+            status="failed", error=f"worker lost; retried as job {pending.id}",
+            finished_at=datetime.utcnow())).rowcount > 0
+
+
+def requeue_stale(session: Session) -> int:
+    """Jobs whose worker stopped sending heartbeats go back to the queue (or fail after MAX_ATTEMPTS)."""
+    cutoff = datetime.utcnow() - STALE_AFTER
+    stale = (Job.status == "running") & (Job.heartbeat_at < cutoff)
+    failed = session.exec(
+        update(Job).where(stale, Job.attempts >= MAX_ATTEMPTS)
+        .values(status="failed", error="worker lost", finished_at=datetime.utcnow())
+    ).rowcount
+    requeued = session.exec(
+        update(Job).where(stale, Job.kind.not_in(list(_pending_keys))).values(status="queued", worker=None)
+    ).rowcount
+    for job in session.exec(select(Job).where(stale, Job.kind.in_(list(_pending_keys)))).all():
+        requeued += _requeue_keyed(session, job, stale)
+    session.commit()
+    if requeued or failed:
+        print(f"[Jobs] Re-queued {requeued} stale jobs, gave up on {failed}")
+    return requeued
+
+
+def _claim_values(worker: str) -> Dict:
+    now = datetime.utcnow()
+    return {"status": "running", "worker": worker, "started_at": now, "heartbeat_at": now,
+            "attempts": Job.attempts + 1, "dedupe_key": None, "progress": None}
+
+
+def _claimable(session: Session):
+    busy = session.exec(
+        select(Job.kind).where(Job.status == "running", Job.kind.in_(EXCLUSIVE_KINDS)).distinct()
+    ).all()
+    query = select(Job.id).where(Job.status == "queued")
+    if busy:
+        query = query.where(Job.kind.not_in(busy))
+    return query.order_by(Job.id).limit(1)
+
+
+def _not_busy():
+    # Claim condition: the job's kind isn't exclusive, or nothing of that kind is running
+    running = aliased(Job)
+    return or_(Job.kind.not_in(EXCLUSIVE_KINDS),
+               ~exists().where(running.kind == Job.kind, running.status == "running"))
+
+
+def _kind_lock_id(kind: str) -> int:
+    # Stable across processes (hash() is salted per process); signed 64-bit for Postgres
+    return int.from_bytes(hashlib.blake2b(f"job:{kind}".encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def _lock_exclusive_kinds(session: Session):
+    # Held until commit / rollback, so a concurrent claimer's busy check runs after
+    # ours has committed and sees the job we set running
+    for kind in sorted(EXCLUSIVE_KINDS):
+        session.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _kind_lock_id(kind)})
+
+
+def claim(worker: str) -> Optional[Job]:
+    """Takes the oldest queued job for this worker, or None if the queue is empty."""
+    with Session(engine, expire_on_commit=False) as session:
+        requeue_stale(session)
+        if engine.dialect.name == "postgresql":
+            _lock_exclusive_kinds(session)
+            job_id = session.exec(_claimable(session).with_for_update(skip_locked=True)).first()
+            if job_id is None:
+                session.rollback()
+                return None
+            won = session.exec(
+                update(Job).where(Job.id == job_id, _not_busy()).values(**_claim_values(worker))
+            ).rowcount
+            session.commit()
+            return session.get(Job, job_id) if won else None
+
+        while True:
+            job_id = session.exec(_claimable(session)).first()
+            if job_id is None:
+                return None
+            won = session.exec(
+                update(Job).where(Job.id == job_id, Job.status == "queued", _not_busy())
+                .values(**_claim_values(worker))
+            ).rowcount
+            session.commit()
+            if won:
+                return session.get(Job, job_id)
+            # Another worker claimed it between the select and the update
+
+
+def heartbeat(job_id: int, progress: Optional[Dict] = None):
+    values = {"heartbeat_at": datetime.utcnow()}
+    if progress is not None:
+        values["progress"] = progress
+    with Session(engine) as session:
+        session.exec(update(Job).where(Job.id == job_id, Job.status == "running").values(**values))
+        session.commit()
+
+
+def finish(job_id: int, result: Optional[Dict] = None, error: Optional[str] = None):
+    with Session(engine) as session:
+        session.exec(update(Job).where(Job.id == job_id).values(
+            status="failed" if error else "done", result=result, error=error, finished_at=datetime.utcnow()))
+        session.commit()
+
+
+def prune():
+    """Drops finished jobs older than KEEP_FINISHED (the scrape_run ledger keeps the details)."""
+    cutoff = datetime.utcnow() - KEEP_FINISHED
+    with Session(engine) as session:
+        session.exec(delete(Job).where(Job.status.in_(["done", "failed"]), Job.created_at < cutoff))
+        session.commit()
@@ -0,0 +1,131 @@
+"""
+Multi-Keyword Matcher.
+Finds every keyword of a large list in one pass over the text (Aho-Corasick),
+instead of one re.search(r'\\b' + kw + r'\\b') per keyword.
+1. Built once per keyword list; matching is a single walk over the text
+2. Whole-word mode reproduces regex \\b semantics exactly, so results are
+   identical to the per-keyword regex loop ("tech" does not match "fintech")
+3. Overlapping keywords are all reported ("retail" and "retail investor")
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+def _is_word(ch: str) -> bool:
+    # Same character class as regex \w for str patterns
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str], whole_words: bool = True):
+        self.keywords: List[str] = list(dict.fromkeys(k for k in keywords if k))
+        self.whole_words = whole_words
+
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for index, kw in enumerate(self.keywords):
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[state][ch] = nxt
+                state = nxt
+            out[state].append(index)
+
+        # Failure links (BFS), merging the outputs of suffix states
+        fail = [0] * len(goto)
+        todo = deque(goto[0].values())
+        while todo:
+            state = todo.popleft()
+            for ch, nxt in goto[state].items():
+                todo.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._lengths = [len(k) for k in self.keywords]
+        # \b at the start / end of "\bkw\b" requires a word / non-word neighbour
+        # depending on whether the keyword's own edge character is a word character
+        self._word_start = [_is_word(k[0]) for k in self.keywords]
+        self._word_end = [_is_word(k[-1]) for k in self.keywords]
+
+    def _bounded(self, text: str, start: int, end: int, index: int) -> bool:
+        before = start > 0 and _is_word(text[start - 1])
+        after = end < len(text) and _is_word(text[end])
+        return before != self._word_start[index] and after != self._word_end[index]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yields (start, end, keyword) for every occurrence, in order of end position."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                start = i + 1 - self._lengths[index]
+                if not self.whole_words or self._bounded(text, start, i + 1, index):
+                    yield start, i + 1, self.keywords[index]
+
+    def find(self, text: str) -> Set[str]:
+        """Set of distinct keywords present in the text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[int] = set()
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    if index in found:
+                        continue
+                    if not self.whole_words or self._bounded(text, i + 1 - self._lengths[index], i + 1, index):
+                        found.add(index)
+        return {self.keywords[i] for i in found}
+
+
+class GroupMatcher:
+    """
+    Keyword lists per label (e.g. KEYWORD_MAP sector -> keywords) behind one automaton.
+    count() returns {label: number of distinct keywords hit}, like scoring each list separately.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]], whole_words: bool = True):
+        self.groups = {label: list(keywords) for label, keywords in groups.items()}
+        self.matcher = KeywordMatcher((kw for kws in self.groups.values() for kw in kws), whole_words)
+        self._labels: Dict[str, List[str]] = {}
+        for label, keywords in self.groups.items():
+            for kw in keywords:
+                self._labels.setdefault(kw, []).append(label)
+
+    def hits(self, text: str) -> Dict[str, List[str]]:
+        """{label: [keywords found]} for labels with at least one hit."""
+        found = self.matcher.find(text)
+        result: Dict[str, List[str]] = {}
+        for label, keywords in self.groups.items():
+            matched = [kw for kw in keywords if kw in found]
+            if matched:
+                result[label] = matched
+        return result
+
+    def labels(self, text: str) -> Set[str]:
+        """Labels with at least one keyword in the text."""
+        return {label for kw in self.matcher.find(text) for label in self._labels[kw]}
+
+    def count(self, text: str) -> Dict[str, int]:
+        return {label: len(keywords) for label, keywords in self.hits(text).items()}
+
+
+def fingerprint(groups: Dict[str, Iterable[str]]) -> int:
+    """Cheap change detector for keyword maps that may be edited at runtime."""
+    return hash(tuple((label, tuple(keywords)) for label, keywords in groups.items()))
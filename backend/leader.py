@@ -0,0 +1,132 @@
+"""
+Leader Election.
+Every API process (uvicorn --workers N, several Render instances) used to run
+its own hourly scheduler. Now exactly one process, the leader, runs periodic jobs:
+1. Postgres: pg_try_advisory_lock on a dedicated connection. The lock lives as long
+   as that session, so a crashed leader releases it as soon as its connection drops
+   (TCP keepalives bound this for hosts that vanish)
+2. SQLite: an exclusive non-blocking lock on a file next to the database; the OS
+   releases it when the process exits
+3. Followers retry every RETRY_INTERVAL; the leader re-checks its lock connection
+   on the same cadence and steps down if it is gone
+"""
+import os
+import threading
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from database import engine
+
+LOCK_ID = 0x5245475741544348 # "REGWATCH"; advisory lock key shared by all processes
+RETRY_INTERVAL = 10.0 # Seconds; worst-case failover after a clean crash
+KEEPALIVE = {"keepalives": 1, "keepalives_idle": 10, "keepalives_interval": 5, "keepalives_count": 3}
+
+
+class _PostgresLock:
+    def __init__(self):
+        self._engine = create_engine(engine.url, poolclass=NullPool, connect_args=KEEPALIVE)
+        self._conn = None
+
+    def acquire(self) -> bool:
+        self._conn = self._engine.connect()
+        got = self._conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": LOCK_ID}).scalar()
+        self._conn.commit() # Session-level lock survives; don't sit "idle in transaction"
+        if not got:
+            self.release()
+        return bool(got)
+
+    def alive(self) -> bool:
+        try:
+            self._conn.execute(text("SELECT 1")).scalar()
+            self._conn.commit()
+            return True
+        except Exception:
+            return False
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.close() # Ends the session, which drops the advisory lock
+            except Exception:
+                pass
+            self._conn = None
+
+
+class _FileLock:
+    def __init__(self):
+        self.path = os.path.abspath((engine.url.database or "database.db") + ".leader.lock")
+        self._file = None
+
+    def acquire(self) -> bool:
+        self._file = open(self.path, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self.release()
+            return False
+
+    def alive(self) -> bool:
+        return self._file is not None
+
+    def release(self):
+        if self._file is not None:
+            self._file.close() # Closing the descriptor releases the lock
+            self._file = None
+
+
+class LeaderElector:
+    """Background thread that calls on_elected / on_demoted as leadership changes."""
+
+    def __init__(self, on_elected: Callable[[], None], on_demoted: Callable[[], None]):
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.is_leader = False
+        self._lock = _PostgresLock() if engine.dialect.name == "postgresql" else _FileLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=RETRY_INTERVAL)
+        if self.is_leader:
+            self._step_down()
+
+    def _step_down(self):
+        self.is_leader = False
+        self._lock.release()
+        try:
+            self.on_demoted()
+        except Exception as e:
+            print(f"[Leader] Demotion callback failed: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.is_leader:
+                    if not self._lock.alive():
+                        print("[Leader] Lost the leader lock, stepping down")
+                        self._step_down()
+                elif self._lock.acquire():
+                    self.is_leader = True
+                    print(f"[Leader] Process {os.getpid()} is now the leader")
+                    self.on_elected()
+            except Exception as e:
+                print(f"[Leader] Election attempt failed: {e}")
+                if self.is_leader:
+                    self._step_down()
+                else:
+                    self._lock.release()
+            self._stop.wait(RETRY_INTERVAL)
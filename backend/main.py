@@ -1,80 +1,74 @@
-from fastapi import FastAPI, Depends, BackgroundTasks, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from sqlmodel import Session, select, func
+from sqlalchemy import tuple_
 from typing import List, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from contextlib import asynccontextmanager
 import pandas as pd
+import base64
 import io
+import json
+import os
 
 from database import create_db_and_tables, get_session, engine as db_engine
-from models import NewsItem, Feedback, UserInterest
+from models import NewsItem, Feedback, UserInterest, StoryCluster, ScrapeRun, Job, NewsListItem
 from dateutil import parser as date_parser
 import scorer # Impact logiced from 'from scraper import fetch_news, search_news' to 'import scraper'
 import scraper
 from engine import engine as relevance_engine
 import vector_engine # RAG
+import seen_filter
+import ingest
+import url_canon
+import story_clusters
+import scrape_runs
+import worker
+import scan_coordinator
+import leader
+import agency_index
+import near_dup
+import stats
+import data_version
+import response_cache
 
 # Scheduler setup
 scheduler = BackgroundScheduler()
+elector = leader.LeaderElector(on_elected=scheduler.resume, on_demoted=scheduler.pause)
 
 from difflib import SequenceMatcher
 
-def scheduled_scrape():
-    print("Running scheduled scrape...")
-    headers = {"User-Agent": "Mozilla/5.0"}
-    items = scraper.fetch_news()
-    
-    with Session(db_engine) as session:
-        existing_db_items = session.exec(select(NewsItem)).all()
-        url_map = {item.url: item for item in existing_db_items}
-        
-        new_count = 0
-        updated_count = 0
-        new_items_to_embed = []
-        
-        for item in items:
-            # 1. URL Check (Exact Match)
-            if item.url in url_map:
-                existing = url_map[item.url]
-                if not existing.is_manual and item.impact_rating != existing.impact_rating: 
-                     existing.impact_rating = item.impact_rating
-                     session.add(existing)
-                     updated_count += 1
-            else:
-                # Add new item
-                session.add(item)
-                new_items_to_embed.append(item)
-                url_map[item.url] = item 
-                new_count += 1
-        
-        # CRITICAL: Save changes!
-        session.commit()
-        
-        # Refresh to get IDs for embedding
-        for i in new_items_to_embed:
-            session.refresh(i)
-
-    # Cloud Brain: Generate Embeddings for new items
-    if new_items_to_embed:
-        print(f"Generating embeddings for {len(new_items_to_embed)} new items...")
-        vector_engine.index_items(new_items_to_embed)
-
-    print(f"Scraped {len(items)} items. Added {new_count}, Updated {updated_count}.")
+# Scans run in worker.py (separate process, or a thread here with EMBEDDED_WORKER=1);
+# the API only enqueues jobs
+EMBEDDED_WORKER = os.environ.get("EMBEDDED_WORKER", "1") == "1"
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
-    # Schedule every hour
-    scheduler.add_job(scheduled_scrape, 'interval', hours=1)
-    scheduler.start()
-    # scheduled_scrape() # Disable auto-run on boot to prevent crash loop
+    ingest.backfill_url_hashes()
+    agency_index.backfill()
+    stats.rebuild()
+    # Schedule every hour. Only the elected leader process runs periodic jobs;
+    # the others keep a paused scheduler and take over if the leader dies
+    scheduler.add_job(scan_coordinator.request_scheduled_scan, 'interval', hours=1)
+    scheduler.add_job(stats.rebuild, 'interval', hours=1) # Absorb edits made outside the API
+    scheduler.add_job(url_canon.retry_failed, 'interval', hours=1) # Re-key items behind unresolved links
+    scheduler.start(paused=True)
+    elector.start()
+    stop_worker = None
+    if EMBEDDED_WORKER:
+        seen_filter.load()
+        stop_worker = worker.start_embedded()
+    # scan_coordinator.request_scheduled_scan() # Disable auto-run on boot to prevent crash loop
     yield
+    elector.stop()
     scheduler.shutdown()
+    if stop_worker:
+        stop_worker.set()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -86,6 +80,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 @app.get("/debug/db")
@@ -105,13 +100,55 @@ def debug_db_connection(session: Session = Depends(get_session)):
         "env_var_found": db_url != "NOT_SET",
         "active_engine_url": str(db_engine.url).split("@")[-1], # Mask password
         "is_sqlite": is_sqlite,
-        "actual_row_count": count
+        "actual_row_count": count,
+        "scheduler_leader": elector.is_leader
     }
 
 @app.post("/scan")
-def trigger_scan(background_tasks: BackgroundTasks):
-    background_tasks.add_task(scheduled_scrape)
-    return {"message": "Scan triggered in background"}
+def trigger_scan(full_backfill: bool = False, source: Optional[List[str]] = Query(None)):
+    # full_backfill=true re-runs the 30-day sweep instead of the incremental window.
+    # source=gov&source=CNA (or source=gov,CNA) rescans only those; see /scan/sources
+    sources = [s for value in source or [] for s in value.split(",")]
+    try:
+        outcome = scan_coordinator.request_scan(sources, full_backfill, "manual")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if outcome["status"] == "running":
+        message = "Scan already running"
+    elif outcome["coalesced"]:
+        message = "Scan already queued"
+    else:
+        message = "Scan queued"
+    return {"message": message, **outcome}
+
+@app.get("/scan/status")
+def scan_status():
+    """Running / queued scan with stage, feed progress and ETA, plus the last finished run."""
+    return scan_coordinator.status()
+
+@app.get("/scan/sources")
+def scan_sources():
+    return scraper.scan_source_names()
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int, session: Session = Depends(get_session)):
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/runs")
+def list_runs(limit: int = 20, session: Session = Depends(get_session)):
+    """Recent scrape runs with p50/p95 durations and the slowest sources."""
+    return scrape_runs.summary(session, max(1, min(limit, 200)))
+
+@app.get("/runs/{run_id}")
+def get_run(run_id: int, session: Session = Depends(get_session)):
+    """One run including per-source fetch stats and per-stage filter counts."""
+    run = session.get(ScrapeRun, run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return run
 
 class UpdateItemRequest(BaseModel):
     sector: Optional[str] = None
@@ -124,22 +161,25 @@ def update_item(item_id: int, update: UpdateItemRequest, session: Session = Depe
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
-    # Update fields if provided
-    if update.sector is not None:
-        item.sector = update.sector
-    if update.agency is not None:
-        item.agency = update.agency
-    if update.impact_rating is not None:
-        # TODO: Implement "Learning" from this override (User Request)
-        # For now, just apply the override.
-        # Check against heuristics? No, user overrides everything.
-        print(f"Manual Impact Override: {item.title} ({item.impact_rating} -> {update.impact_rating})")
-        item.impact_rating = update.impact_rating
-        
-    # Mark as manually corrected so scanner doesn't overwrite
-    item.is_manual = True
-    
-    session.add(item)
+    with stats.tracking(session, NewsItem.id == item_id):
+        # Update fields if provided
+        if update.sector is not None:
+            item.sector = update.sector
+        if update.agency is not None:
+            item.agency = update.agency
+            agency_index.set_agencies(session, item.id, item.agency)
+        if update.impact_rating is not None:
+            # TODO: Implement "Learning" from this override (User Request)
+            # For now, just apply the override.
+            # Check against heuristics? No, user overrides everything.
+            print(f"Manual Impact Override: {item.title} ({item.impact_rating} -> {update.impact_rating})")
+            item.impact_rating = update.impact_rating
+
+        # Mark as manually corrected so scanner doesn't overwrite
+        item.is_manual = True
+
+        session.add(item)
+    data_version.bump(session)
     session.commit()
     session.refresh(item)
     session.refresh(item)
@@ -148,13 +188,19 @@ def update_item(item_id: int, update: UpdateItemRequest, session: Session = Depe
 @app.post("/items", response_model=NewsItem)
 def create_item(item: NewsItem, session: Session = Depends(get_session)):
     print(f"DEBUG: create_item payload: {item}")
-    # Check for existing URL to avoid duplicates
-    existing = session.exec(select(NewsItem).where(NewsItem.url == item.url)).first()
+    # Check for existing URL to avoid duplicates. Offline only: no Google News lookup
+    # inside a request; url_canon.retry_failed() resolves the link and re-keys the item
+    item.url = url_canon.canonical_url(item.url, resolve=False)
+    item.url_hash = url_canon.url_hash(item.url)
+    existing = session.exec(select(NewsItem).where(NewsItem.url_hash == item.url_hash)).first()
     if existing:
         # If it was hidden, unhide it?
         if existing.is_hidden:
-            existing.is_hidden = False
-            session.add(existing)
+            with stats.tracking(session, NewsItem.id == existing.id):
+                existing.is_hidden = False
+                session.add(existing)
+            near_dup.index_items(session, [existing.id])
+            data_version.bump(session)
             session.commit()
             session.refresh(existing)
         return existing
@@ -181,32 +227,110 @@ def create_item(item: NewsItem, session: Session = Depends(get_session)):
         except:
             item.scraped_at = datetime.utcnow()
         
-    session.add(item)
+    with stats.tracking(session, NewsItem.url_hash == item.url_hash):
+        session.add(item)
+        session.flush()
+        agency_index.set_agencies(session, item.id, item.agency)
+    near_dup.index_items(session, [item.id]) # Later scans fold other outlets' copies into it
+    data_version.bump(session)
     session.commit()
     session.refresh(item)
     return item
 
-@app.get("/news", response_model=List[NewsItem])
-def get_news(sector: Optional[str] = None, limit: Optional[int] = None, offset: int = 0, session: Session = Depends(get_session)):
+NEWS_LIST_FIELDS = list(NewsListItem.model_fields)
+
+def _news_list_columns(fields: Optional[str]) -> List[str]:
+    # ?fields=title,url -> ["id", "title", "url"]; id is always included
+    if not fields:
+        return NEWS_LIST_FIELDS
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(NEWS_LIST_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [f for f in NEWS_LIST_FIELDS if f == "id" or f in wanted]
+
+NEWS_PAGE_SIZE = 50    # Default /news page
+NEWS_MAX_PAGE_SIZE = 200
+TIMESERIES_DEFAULT_DAYS = 30
+STATS_SCOPES = ("data", "stats") # Counter rebuilds invalidate these, not /news
+
+def _encode_cursor(published_at: datetime, item_id: int) -> str:
+    raw = json.dumps([published_at.isoformat(), item_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _set_etag(response: Response, tag: str):
+    # no-cache: browsers keep the body but revalidate (If-None-Match) on every request
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = "no-cache"
+
+def _not_modified(tag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": tag, "Cache-Control": "no-cache"})
+
+def _decode_cursor(cursor: str):
     try:
-        # Filter hidden items
-        query = select(NewsItem).where(NewsItem.is_hidden == False)
+        published_at, item_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(published_at), int(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/news", response_model=List[NewsListItem], response_model_exclude_unset=True)
+def get_news(request: Request, response: Response, sector: Optional[str] = None, agency: Optional[str] = None, limit: int = NEWS_PAGE_SIZE,
+             cursor: Optional[str] = None, fields: Optional[str] = None, session: Session = Depends(get_session)):
+    # Keyset pagination on (published_at, id) newest first: pass the X-Next-Cursor header
+    # of one page as ?cursor= for the next. Cost per page doesn't grow with depth (no OFFSET)
+    limit = max(1, min(limit, NEWS_MAX_PAGE_SIZE))
+    after = _decode_cursor(cursor) if cursor else None
+    # Explicit column select: embeddings and other unused columns are never read or encoded
+    columns = _news_list_columns(fields)
+    selected = [getattr(NewsItem, c) for c in columns if c != "member_count"]
+    if "published_at" not in columns:
+        selected.append(NewsItem.published_at) # Needed for the cursor
+
+    def load_page():
+        query = select(*selected).where(NewsItem.is_hidden == False)
+        if "member_count" in columns:
+            # One row per story (duplicates are hidden cluster members) with the
+            # story's member count from a single outer join
+            query = (query.add_columns(func.coalesce(StoryCluster.member_count, 1).label("member_count"))
+                     .outerjoin(StoryCluster, StoryCluster.canonical_item_id == NewsItem.id))
         if sector:
             query = query.where(NewsItem.sector == sector)
-            
-        # Sort
-        query = query.order_by(NewsItem.published_at.desc())
-        
-        # Apply pagination only if requested
-        if limit:
-            query = query.limit(limit).offset(offset)
-            
-        items = session.exec(query).all()
-        return items
+        if agency:
+            # Matches multi-agency items ("LTA, MOT") through the item_agency index
+            query = query.where(agency_index.has_agency(agency))
+        if after:
+            query = query.where(tuple_(NewsItem.published_at, NewsItem.id) < tuple_(*after))
+
+        # Sort (served by ix_newsitem_feed_order); one extra row tells whether there is a next page
+        query = query.order_by(NewsItem.published_at.desc(), NewsItem.id.desc()).limit(limit + 1)
+        rows = session.exec(query).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].published_at, rows[-1].id)
+        return {"items": [{c: row._mapping[c] for c in columns} for row in rows], "next_cursor": next_cursor}
+
+    cache_key = response_cache.key("news", {"sector": sector, "agency": agency and agency.strip().lower(), "limit": limit,
+                                            "cursor": cursor, "fields": ",".join(columns)})
+    tag = response_cache.etag(cache_key)
+    if response_cache.not_modified(request.headers.get("if-none-match"), tag):
+        return _not_modified(tag)
+    try:
+        page = response_cache.cached(cache_key, load_page)
     except Exception as e:
         print(f"Error fetching news: {e}")
         return []
 
+    _set_etag(response, tag)
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["items"]
+
+@app.get("/items/{item_id}/sources")
+def get_item_sources(item_id: int, session: Session = Depends(get_session)):
+    # "Also seen on": the other items of this item's story cluster
+    return story_clusters.sources_for(session, item_id)
+
 @app.post("/feedback")
 def submit_feedback(feedback: Feedback, session: Session = Depends(get_session)):
     session.add(feedback)
@@ -221,8 +345,10 @@ def delete_item(item_id: int, session: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Item not found")
     
     # Soft delete (hide) instead of removing record
-    item.is_hidden = True
-    session.add(item)
+    with stats.tracking(session, NewsItem.id == item_id):
+        item.is_hidden = True
+        session.add(item)
+    data_version.bump(session)
     session.commit()
     return {"status": "hidden"}
 
@@ -234,6 +360,7 @@ def toggle_save_item(item_id: int, session: Session = Depends(get_session)):
     
     item.is_saved = not item.is_saved
     session.add(item)
+    data_version.bump(session)
     
     # Capture Interest if Saved
     if item.is_saved:
@@ -306,50 +433,47 @@ def export_news(session: Session = Depends(get_session)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/stats")
-def get_stats(impact: Optional[str] = None, session: Session = Depends(get_session)):
+def get_stats(request: Request, response: Response, impact: Optional[str] = None, session: Session = Depends(get_session)):
+    """Aggregation stats for Dashboard. Optional filter by impact."""
+    impact = None if impact in (None, "", "All") else impact
+    cache_key = response_cache.key("stats", {"impact": impact}, STATS_SCOPES)
+    tag = response_cache.etag(cache_key)
+    if response_cache.not_modified(request.headers.get("if-none-match"), tag):
+        return _not_modified(tag)
     try:
-        query = select(NewsItem).where(NewsItem.is_hidden == False)
-        if impact and impact != 'All':
-            query = query.where(NewsItem.impact_rating == impact)
-            
-        items = session.exec(query).all()
-        
-        # Calculate stats
-        total = len(items)
-        
-        # Impact Distribution
-        impact_counts = {}
-        for i in items:
-            impact_counts[i.impact_rating] = impact_counts.get(i.impact_rating, 0) + 1
-            
-        impact_data = [{"name": k, "value": v} for k, v in impact_counts.items()]
-        
-        # Top Sectors
-        sector_counts = {}
-        for i in items:
-            if i.sector:
-                sector_counts[i.sector] = sector_counts.get(i.sector, 0) + 1
-        sectors_data = [{"name": k, "value": v} for k, v in sorted(sector_counts.items(), key=lambda x: x[1], reverse=True)[:5]]
-        
-        # Top Agencies
-        agency_counts = {}
-        for i in items:
-            if i.agency:
-                agency_counts[i.agency] = agency_counts.get(i.agency, 0) + 1
-        agencies_data = [{"name": k, "value": v} for k, v in sorted(agency_counts.items(), key=lambda x: x[1], reverse=True)[:5]]
-        
-        return {
-            "total": total,
-            "impact": impact_data,
-            "sectors": sectors_data,
-            "agencies": agencies_data
-        }
+        result = response_cache.cached(cache_key, lambda: stats.get_stats(session, impact))
+        _set_etag(response, tag)
+        return result
     except Exception as e:
         print(f"Stats check failed: {e}")
         return {
             "total": 0, "impact": [], "sectors": [], "agencies": []
         }
 
+@app.get("/stats/timeseries")
+def get_stats_timeseries(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: str = "day",
+    group_by: Optional[str] = Query(None, description="impact_rating, sector, agency or source"),
+    impact: Optional[str] = None,
+    sector: Optional[str] = None,
+    agency: Optional[str] = None,
+    source: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    """Visible items per day / week / month from the daily rollups. Defaults to the last 30 days."""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=TIMESERIES_DEFAULT_DAYS - 1)
+    filters = {"impact_rating": impact, "sector": sector, "agency": agency, "source": source}
+    filters = {k: v for k, v in filters.items() if v not in (None, "", "All")}
+    params = {**filters, "start": start.isoformat(), "end": end.isoformat(), "granularity": granularity, "group_by": group_by}
+    try:
+        return response_cache.cached(response_cache.key("timeseries", params, STATS_SCOPES),
+                                     lambda: stats.timeseries(session, start, end, granularity, group_by, filters))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 class SearchRequest(BaseModel):
     query: str
 
@@ -437,18 +561,27 @@ def add_news_item(item: NewsItem, session: Session = Depends(get_session)):
     # Fix: Reset scraped_at to now (since we are adding it now) or parse it
     item.scraped_at = datetime.utcnow()
 
-    # check for existence
-    existing = session.exec(select(NewsItem).where(NewsItem.url == item.url)).first()
+    # check for existence (offline canonicalization, as in create_item)
+    item.url = url_canon.canonical_url(item.url, resolve=False)
+    item.url_hash = url_canon.url_hash(item.url)
+    existing = session.exec(select(NewsItem).where(NewsItem.url_hash == item.url_hash)).first()
     if existing:
         # If it was hidden (soft deleted), un-hide it because user explicitly added it back
         if existing.is_hidden:
-            existing.is_hidden = False
-            session.add(existing)
+            with stats.tracking(session, NewsItem.id == existing.id):
+                existing.is_hidden = False
+                session.add(existing)
+            near_dup.index_items(session, [existing.id])
+            data_version.bump(session)
             session.commit()
             return {"status": "restored", "id": existing.id}
         return {"status": "exists", "id": existing.id}
     
-    session.add(item)
+    with stats.tracking(session, NewsItem.url_hash == item.url_hash):
+        session.add(item)
+        session.flush()
+        agency_index.set_agencies(session, item.id, item.agency)
+    near_dup.index_items(session, [item.id]) # Later scans fold other outlets' copies into it
     
     # Capture Interest from Added Item (Smart Learning)
     try:
@@ -474,6 +607,7 @@ def add_news_item(item: NewsItem, session: Session = Depends(get_session)):
     except Exception as e:
         print(f"Failed to capture added interest: {e}")
 
+    data_version.bump(session)
     session.commit()
     session.refresh(item)
     return {"status": "added", "id": item.id}
@@ -485,54 +619,19 @@ def update_item(item_id: int, updates: dict, session: Session = Depends(get_sess
         raise HTTPException(status_code=404, detail="Item not found")
         
     # Apply updates
-    for key, value in updates.items():
-        if hasattr(item, key):
-            setattr(item, key, value)
-    
-    session.add(item)
+    with stats.tracking(session, NewsItem.id == item_id):
+        for key, value in updates.items():
+            if hasattr(item, key):
+                setattr(item, key, value)
+        if "agency" in updates:
+            agency_index.set_agencies(session, item.id, item.agency)
+
+        session.add(item)
+    data_version.bump(session)
     session.commit()
     session.refresh(item)
     return item
 
-@app.get("/stats")
-def get_stats(impact: Optional[str] = None, session: Session = Depends(get_session)):
-    """Aggregation stats for Dashboard. Optional filter by impact."""
-    query = select(NewsItem).where(NewsItem.is_hidden == False)
-    
-    if impact and impact != "All":
-        query = query.where(NewsItem.impact_rating == impact)
-        
-    items = session.exec(query).all()
-    
-    # Init counters
-    sectors = {}
-    agencies = {}
-    impact_counts = {"High": 0, "Medium": 0, "Low": 0}
-    
-    for item in items:
-        # Sector
-        s = item.sector or "Unknown"
-        sectors[s] = sectors.get(s, 0) + 1
-        
-        # Agency
-        a = item.agency or "Unknown"
-        agencies[a] = agencies.get(a, 0) + 1
-        
-        # Impact
-        i = item.impact_rating or "Medium"
-        impact_counts[i] = impact_counts.get(i, 0) + 1
-        
-    # Formatting for Recharts (List of Dicts)
-    def to_chart_data(d):
-        return [{"name": k, "value": v} for k, v in d.items()]
-        
-    return {
-        "sectors": sorted(to_chart_data(sectors), key=lambda x: x['value'], reverse=True),
-        "agencies": sorted(to_chart_data(agencies), key=lambda x: x['value'], reverse=True),
-        "impact": to_chart_data(impact_counts),
-        "total": len(items)
-    }
-
 class BriefRequest(BaseModel):
     impact: Optional[str] = None
 
@@ -561,6 +660,12 @@ def generate_brief(req: BriefRequest = None, session: Session = Depends(get_sess
     else:
         query = query.where(NewsItem.impact_rating == "High")
 
+    # Same items, same day -> same brief; spares the LLM call until the data changes
+    cache_key = response_cache.key("brief", {"impact": impact_filter, "date": datetime.now().date().isoformat()})
+    cached_brief = response_cache.get(cache_key)
+    if cached_brief is not None:
+        return cached_brief
+
     # Sort and Limit - Increased limit for LLM context
     query = query.order_by(NewsItem.published_at.desc()).limit(30)
     items = session.exec(query).all()
@@ -661,7 +766,10 @@ def generate_brief(req: BriefRequest = None, session: Session = Depends(get_sess
         md_content = f"# 📋 Executive Regulatory Brief {filter_label}\n**Date**: {date_str}\n\n" + md_content
 
     md_content += "---\n*Generated by RegWatch AI*"
-    return {"content": md_content}
+    brief = {"content": md_content}
+    if llm_success:
+        response_cache.put(cache_key, brief) # Keyword fallback is retried next time
+    return brief
 
 if __name__ == "__main__":
     import uvicorn
@@ -2,6 +2,8 @@
 import os
 from sqlmodel import SQLModel, create_engine, Session, select
 from models import NewsItem, UserInterest
+from database import add_missing_columns
+import url_canon
 from sqlalchemy import create_engine as sa_create_engine
 
 # 1. Local Connection (Source)
@@ -24,12 +26,14 @@ def migrate_data():
     try:
         cloud_engine = create_engine(cloud_url)
         SQLModel.metadata.create_all(cloud_engine) # Ensure tables exist
+        add_missing_columns(cloud_engine) # e.g. url_hash on older cloud tables
         print("✅ Connected to Cloud Database.")
     except Exception as e:
         print(f"❌ Failed to connect to cloud: {e}")
         return
 
     # 3. Read Local Data
+    add_missing_columns(local_engine)
     with Session(local_engine) as local_session:
         news_items = local_session.exec(select(NewsItem)).all()
         interests = local_session.exec(select(UserInterest)).all()
@@ -43,19 +47,27 @@ def migrate_data():
         
         print("\nMigrating News Items...")
         # Cache existing URLs to avoid slow checks
-        existing_urls_stmt = select(NewsItem.url)
-        existing_urls = set(cloud_session.exec(existing_urls_stmt).all())
+        existing_urls_stmt = select(NewsItem.url, NewsItem.url_hash)
+        existing_urls = set()
+        for url, key in cloud_session.exec(existing_urls_stmt).all():
+            existing_urls.add(key or url_canon.url_hash(url))
         
+        # Resolve Google News redirects once (cached) so they match the publisher URL
+        canonical = url_canon.canonicalize_many(item.url for item in news_items)
         for item in news_items:
-            if item.url in existing_urls:
+            url = canonical.get(item.url, item.url)
+            key = url_canon.url_hash(url)
+            if key in existing_urls:
                 skip_count += 1
                 continue
+            existing_urls.add(key)
             
             # Create new instance (without ID, to let Postgres assign new ID)
             new_item = NewsItem(
                 title=item.title,
                 summary=item.summary,
-                url=item.url,
+                url=url,
+                url_hash=key,
                 source=item.source,
                 sector=item.sector,
                 agency=item.agency,
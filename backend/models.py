@@ -1,14 +1,22 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON, BigInteger, LargeBinary
 from pgvector.sqlalchemy import Vector
 
 class NewsItem(SQLModel, table=True):
+    __table_args__ = (
+        # /news keyset pagination: visible items by (published_at, id) descending
+        Index("ix_newsitem_feed_order", "is_hidden", "published_at", "id"),
+        # /stats GROUP BY reads only this (covering) index
+        Index("ix_newsitem_stats", "is_hidden", "impact_rating", "sector", "agency"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
     summary: str
     url: str
+    # Hash of the normalized URL (url_canon.url_hash), unique -> scans upsert on it
+    url_hash: Optional[str] = Field(default=None, max_length=32, unique=True, index=True)
     source: str
     sector: str
     agency: Optional[str] = Field(default=None)
@@ -19,7 +27,7 @@ class NewsItem(SQLModel, table=True):
     is_hidden: bool = Field(default=False)
     is_saved: bool = Field(default=False)
     
-    # Store other sources for same article
+    # Legacy: other sources for same article, now story_cluster / story_cluster_member
     # Format: [{"source": "CNA", "url": "..."}]
     related_sources: Optional[List[Dict]] = Field(default=None, sa_column=Column(JSON))
     
@@ -33,6 +41,23 @@ class NewsItem(SQLModel, table=True):
     # feedback: list["Feedback"] = Relationship(back_populates="news_item")
 
 
+class NewsListItem(SQLModel):
+    # /news row: only the columns the cards render (no embedding / related_sources).
+    # Optional so ?fields= projections validate; unset fields are left out of the JSON
+    id: int
+    title: Optional[str] = None
+    summary: Optional[str] = None
+    url: Optional[str] = None
+    source: Optional[str] = None
+    sector: Optional[str] = None
+    agency: Optional[str] = None
+    published_at: Optional[datetime] = None
+    impact_rating: Optional[str] = None
+    is_circular: Optional[bool] = None
+    is_saved: Optional[bool] = None
+    member_count: Optional[int] = None # Sources covering the story (story_cluster)
+
+
 class Feedback(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     news_item_id: int = Field(foreign_key="newsitem.id")
@@ -44,3 +69,146 @@ class UserInterest(SQLModel, table=True):
     score: float = Field(default=1.0) # Base score
     last_active: datetime = Field(default_factory=datetime.utcnow)
     source: str = Field(default="search") # search, saved_item
+
+class FeedValidator(SQLModel, table=True):
+    # HTTP cache validators per feed URL (conditional GET)
+    url: str = Field(primary_key=True)
+    etag: Optional[str] = Field(default=None)
+    last_modified: Optional[str] = Field(default=None)
+    body_hash: Optional[str] = Field(default=None)
+    checked_at: datetime = Field(default_factory=datetime.utcnow)
+
+class SeenEntry(SQLModel, table=True):
+    # Feed entries already processed by a scan (GUID/link + content hash)
+    key: str = Field(primary_key=True)
+    seen_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+class BackfillQueryState(SQLModel, table=True):
+    # Per-query history for the incremental backfill planner
+    query_key: str = Field(primary_key=True)
+    query: str
+    last_success_at: Optional[datetime] = Field(default=None)
+    last_full_at: Optional[datetime] = Field(default=None)
+    runs: int = Field(default=0)
+    new_urls: int = Field(default=0) # Total new URLs returned over all runs
+    empty_streak: int = Field(default=0) # Consecutive runs without new URLs
+    next_run_at: Optional[datetime] = Field(default=None)
+
+class ImpactMemo(SQLModel, table=True):
+    # scorer.analyze_impact results keyed by a hash of rules version + title + summary
+    key: str = Field(primary_key=True)
+    impact_rating: str
+    rules_version: str = Field(index=True)
+
+class UrlAlias(SQLModel, table=True):
+    # Resolved redirect links (e.g. news.google.com articles); canonical_url is None if resolution failed
+    source_hash: str = Field(primary_key=True, max_length=32)
+    source_url: str
+    canonical_url: Optional[str] = Field(default=None)
+    resolved_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ItemSignature(SQLModel, table=True):
+    # MinHash of the item title (near_dup.py), NUM_PERM uint32 values
+    item_id: int = Field(primary_key=True)
+    signature: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    version: str
+
+class LshBucket(SQLModel, table=True):
+    # One row per (LSH band bucket, item); items sharing a bucket are near-duplicate candidates
+    bucket: int = Field(sa_column=Column(BigInteger, primary_key=True))
+    item_id: int = Field(primary_key=True, index=True)
+
+class StoryCluster(SQLModel, table=True):
+    # One story covered by several sources; the canonical item is the visible one
+    __tablename__ = "story_cluster"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    canonical_item_id: int = Field(unique=True, index=True)
+    member_count: int = Field(default=1) # Items in the story, canonical included
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class StoryClusterMember(SQLModel, table=True):
+    __tablename__ = "story_cluster_member"
+    item_id: int = Field(primary_key=True) # An item belongs to at most one story
+    cluster_id: int = Field(index=True)
+    joined_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ScrapeRun(SQLModel, table=True):
+    # One row per scan (scrape_runs.record); details per feed / filter stage as JSON
+    __tablename__ = "scrape_run"
+    id: Optional[int] = Field(default=None, primary_key=True)
+    started_at: datetime = Field(index=True)
+    finished_at: datetime
+    duration: float # Seconds
+    trigger: str = Field(default="scheduled") # scheduled, manual
+    full_backfill: bool = Field(default=False)
+    status: str = Field(default="ok") # ok, error
+    scraped: int = Field(default=0)
+    added: int = Field(default=0)
+    updated: int = Field(default=0)
+    merged: int = Field(default=0)
+    embedded: int = Field(default=0)
+    feeds: int = Field(default=0)
+    feeds_unchanged: int = Field(default=0)
+    feeds_failed: int = Field(default=0)
+    errors: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+    # [{"source", "url", "status", "elapsed", "bytes", "entries", "not_modified", "error", "items"}]
+    sources: Optional[List[Dict]] = Field(default=None, sa_column=Column(JSON))
+    # {pipeline: {stage: {"seen", "rejected", "ms"}}}
+    pipeline: Optional[Dict] = Field(default=None, sa_column=Column(JSON))
+
+class Job(SQLModel, table=True):
+    # Work queue between the API (enqueues) and worker.py (claims and runs)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True) # e.g. "scrape"
+    params: Optional[Dict] = Field(default=None, sa_column=Column(JSON))
+    status: str = Field(default="queued", index=True) # queued, running, done, failed
+    # At most one queued job per key (e.g. "scrape:pending"); cleared when the job is claimed
+    dedupe_key: Optional[str] = Field(default=None, unique=True)
+    attempts: int = Field(default=0)
+    worker: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[Dict] = Field(default=None, sa_column=Column(JSON))
+    progress: Optional[Dict] = Field(default=None, sa_column=Column(JSON)) # Written with heartbeats
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None # Refreshed while running; stale -> re-queued
+    finished_at: Optional[datetime] = None
+
+class ItemAgency(SQLModel, table=True):
+    # One row per agency of an item (NewsItem.agency is "LTA, MOT"); /news?agency= looks up here
+    __tablename__ = "item_agency"
+    __table_args__ = (Index("ix_item_agency_agency", "agency", "item_id"),)
+    item_id: int = Field(primary_key=True)
+    agency: str = Field(primary_key=True) # Lower-cased (agency_index.split_agencies)
+
+class StatsCounter(SQLModel, table=True):
+    # Visible items per (impact, sector, agency) combination, kept current by stats.tracking();
+    # "" stands for a missing sector / agency
+    __tablename__ = "stats_counter"
+    impact_rating: str = Field(primary_key=True)
+    sector: str = Field(primary_key=True)
+    agency: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+class DailyRollup(SQLModel, table=True):
+    # Visible items per published day (UTC) and (impact, sector, agency, source); kept
+    # current with stats_counter by stats.tracking(). Day leads the key for range scans.
+    # One row per agency of an item (agency_index.split_agencies, "" for none); `lead`
+    # marks the first, so totals count every item once
+    __tablename__ = "daily_rollup"
+    day: date = Field(primary_key=True)
+    impact_rating: str = Field(primary_key=True)
+    sector: str = Field(primary_key=True)
+    agency: str = Field(primary_key=True)
+    source: str = Field(primary_key=True)
+    lead: bool = Field(default=True, primary_key=True)
+    count: int = Field(default=0)
+
+class DataVersion(SQLModel, table=True):
+    # One row per scope (data_version.SCOPES), bumped by every write that changes what
+    # /news, /stats and /brief return (data_version.bump); keys the response cache
+    __tablename__ = "data_version"
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0))
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
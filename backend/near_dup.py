@@ -0,0 +1,198 @@
+"""
+Near-Duplicate Detection (MinHash + LSH).
+Replaces the O(n^2) SequenceMatcher sweep of deduplicate_existing.py:
+1. Each visible item gets a MinHash signature of its title (char 4-gram shingles,
+   126 hashes), stored in `itemsignature`
+2. The signature is split into 42 bands of 3; each band is a bucket row in
+   `lshbucket`, so candidates are found with one indexed lookup. 3-row bands
+   still catch the borderline title pairs (shingle Jaccard ~0.35 at ratio 0.65)
+3. Candidates are confirmed with the old title ratio (> 0.65); a confirmed
+   duplicate joins the existing item's story cluster (story_clusters) and is hidden
+New scan items are checked in write_batch; items added or restored through the API
+are indexed unchecked (index_items). Rebuild for the existing table:
+    python near_dup.py
+"""
+import hashlib
+import re
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from sqlmodel import Session, select, delete, update
+
+from database import engine
+from models import ItemSignature, LshBucket, NewsItem
+import data_version
+import stats
+import story_clusters
+
+SIGNATURE_VERSION = "1" # Bump when shingling / hashing changes, then rebuild
+SHINGLE_SIZE = 4
+NUM_PERM = 126
+BANDS = 42
+ROWS = NUM_PERM // BANDS
+TITLE_RATIO = 0.65     # Same threshold as the old SequenceMatcher sweep
+MAX_CANDIDATES = 50    # Verified per item, most shared bands first
+
+_PRIME = np.uint64(4294967311) # > 2^32, so (a * x + b) stays below 2^64
+_rng = np.random.RandomState(20240601)
+_A = _rng.randint(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def _normalize(title: str) -> str:
+    return re.sub(r"[\W_]+", " ", (title or "").lower()).strip()
+
+
+def shingles(title: str) -> Set[str]:
+    text = _normalize(title)
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(title: str) -> Optional[np.ndarray]:
+    """(NUM_PERM,) uint32 MinHash of the title, None for empty titles."""
+    grams = shingles(title)
+    if not grams:
+        return None
+    x = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little") for g in grams),
+        dtype=np.uint64, count=len(grams),
+    )
+    hashed = (_A[:, None] * x[None, :] + _B[:, None]) % _PRIME
+    return (hashed.min(axis=1) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def band_buckets(sig: np.ndarray) -> List[int]:
+    """One 63-bit bucket id per band (band index is part of the hash)."""
+    buckets = []
+    for band, rows in enumerate(sig.reshape(BANDS, ROWS)):
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "big") >> 1)
+    return buckets
+
+
+def is_duplicate_title(a: str, b: str) -> bool:
+    return SequenceMatcher(None, a.lower(), b.lower()).ratio() > TITLE_RATIO
+
+
+def _index(session: Session, item_id: int, sig: np.ndarray, buckets: List[int]):
+    session.add(ItemSignature(item_id=item_id, signature=sig.tobytes(), version=SIGNATURE_VERSION))
+    session.add_all(LshBucket(bucket=b, item_id=item_id) for b in buckets)
+
+
+def _candidates(session: Session, buckets: List[int], exclude: int) -> List[int]:
+    hits = session.exec(select(LshBucket.item_id).where(LshBucket.bucket.in_(buckets))).all()
+    counts = Counter(i for i in hits if i != exclude)
+    return [item_id for item_id, _ in counts.most_common(MAX_CANDIDATES)]
+
+
+def index_items(session: Session, item_ids: Iterable[int]):
+    """
+    Indexes items without the duplicate check (in the caller's transaction): items a
+    user added or restored stay visible, but later scans fold other copies into them.
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return
+    rows = session.exec(select(NewsItem.id, NewsItem.title).where(NewsItem.id.in_(item_ids))).all()
+    session.exec(delete(LshBucket).where(LshBucket.item_id.in_(item_ids)))
+    session.exec(delete(ItemSignature).where(ItemSignature.item_id.in_(item_ids)))
+    for item_id, title in rows:
+        sig = signature(title)
+        if sig is not None:
+            _index(session, item_id, sig, band_buckets(sig))
+
+
+def check_new(session: Session, item_ids: Iterable[int]) -> Set[int]:
+    """
+    Checks freshly inserted items against the index (in the caller's transaction).
+    Duplicates join the existing item's story cluster and are hidden; the rest are indexed.
+    Returns the IDs that were hidden.
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return set()
+    rows = session.exec(
+        select(NewsItem.id, NewsItem.title, NewsItem.url, NewsItem.source, NewsItem.published_at)
+        .where(NewsItem.id.in_(item_ids)).order_by(NewsItem.id)
+    ).all()
+
+    hidden = set()
+    for row in rows:
+        sig = signature(row.title)
+        if sig is None:
+            continue
+        buckets = band_buckets(sig)
+        candidates = _candidates(session, buckets, exclude=row.id)
+        match = None
+        if candidates:
+            visible = session.exec(
+                select(NewsItem.id, NewsItem.title)
+                .where(NewsItem.id.in_(candidates), NewsItem.is_hidden == False)
+            ).all()
+            titles = dict(visible)
+            for candidate in candidates:
+                if candidate in titles and is_duplicate_title(row.title, titles[candidate]):
+                    match = candidate
+                    break
+        if match is None:
+            _index(session, row.id, sig, buckets)
+            session.flush() # Later items of this batch can match this one
+            continue
+
+        story_clusters.add_member(session, match, row.id)
+        session.exec(update(NewsItem).where(NewsItem.id == row.id).values(is_hidden=True))
+        hidden.add(row.id)
+        print(f"  [Duplicate] '{row.title[:60]}' -> #{match}")
+    return hidden
+
+
+def rebuild():
+    """Re-index every visible item, merging and hiding the near-duplicates found on the way."""
+    print("Rebuilding near-duplicate index...")
+    with Session(engine) as session:
+        session.exec(delete(LshBucket))
+        session.exec(delete(ItemSignature))
+        # Oldest first, as in check_new: the first stored copy stays visible, so a
+        # rebuild never flips which item of a story is shown
+        rows = session.exec(
+            select(NewsItem.id, NewsItem.title, NewsItem.url, NewsItem.source, NewsItem.published_at)
+            .where(NewsItem.is_hidden == False).order_by(NewsItem.id)
+        ).all()
+        print(f"Checking {len(rows)} items for duplicates...")
+
+        index: Dict[int, List[int]] = defaultdict(list) # bucket -> kept item ids
+        kept: Dict[int, str] = {} # id -> title
+        hidden_count = 0
+        for row in rows:
+            sig = signature(row.title)
+            if sig is None:
+                continue
+            buckets = band_buckets(sig)
+            counts = Counter(i for b in buckets for i in index.get(b, ()))
+            match = next((i for i, _ in counts.most_common(MAX_CANDIDATES)
+                          if is_duplicate_title(row.title, kept[i])), None)
+            if match is not None:
+                print(f"Found Duplicate: '{row.title}' (~ '{kept[match]}')")
+                story_clusters.add_member(session, match, row.id)
+                session.exec(update(NewsItem).where(NewsItem.id == row.id).values(is_hidden=True))
+                hidden_count += 1
+                continue
+            kept[row.id] = row.title
+            for b in buckets:
+                index[b].append(row.id)
+            _index(session, row.id, sig, buckets)
+
+        if hidden_count:
+            data_version.bump(session)
+        session.commit()
+    print(f"Finished! Indexed {len(kept)} items, merged {hidden_count} duplicates into story clusters.")
+    if hidden_count:
+        stats.rebuild() # Hidden here without stats.tracking()
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,236 @@
+"""
+Entry Normalization Pipeline.
+One composable path from a raw feed entry to a NewsItem, shared by the scan
+(RSS / interests / backfill) and the interactive search.
+1. Stages run in order of cost: cheap string rejects (cutoff, whitelist) come
+   before BeautifulSoup, relevance scoring and classification
+2. Classification only runs on entries that survived every filter
+3. Entries in / out and time spent are counted per stage into the PipelineStats of
+   the current run (see collecting()), so a search during a scan doesn't mix in
+"""
+import html
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from bs4 import BeautifulSoup
+from dateutil import parser as date_parser
+
+# Stage costs (lower runs first). Stages depending on a field must cost more than its producer.
+COST_TITLE = 0      # Title / source split
+COST_TEXT = 5       # Substring rejects on title / source
+COST_LINK = 10      # Whitelist and other link / source checks
+COST_DEDUPE = 15
+COST_DATE = 20      # Date parsing (struct_time / dateutil)
+COST_CUTOFF = 25
+COST_SUMMARY = 40   # BeautifulSoup HTML stripping
+COST_BODY = 45      # Substring rejects on title + summary
+COST_RELEVANCE = 50
+COST_CONTENT = 55   # Vector similarity filter
+COST_NETWORK = 60   # Deep scan of the article page
+COST_CLASSIFY = 90  # Sector / agency / impact
+
+
+@dataclass
+class Candidate:
+    entry: Any
+    title: str
+    link: str
+    source: str
+    summary_text: str = ""
+    pub_date: Optional[datetime] = None
+    is_gov: bool = False
+    source_in_text: bool = False # Include source name in text analysis
+    # Set by the classify stage
+    sector: str = "General"
+    agency: str = "Unknown"
+    impact_rating: str = "Medium"
+    is_circular: bool = False
+
+    @property
+    def full_text(self) -> str:
+        text = self.title + " " + self.summary_text
+        if self.source_in_text:
+            text += " " + self.source
+        return text
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[[Candidate], bool] # False rejects the entry
+    cost: int
+
+
+@dataclass
+class StageStats:
+    seen: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+
+class PipelineStats:
+    """Stage counters of one run (a scan, a search)."""
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, StageStats]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, pipeline: str, stage: str, passed: bool, seconds: float):
+        with self._lock:
+            s = self._stages.setdefault(pipeline, {}).setdefault(stage, StageStats())
+            s.seen += 1
+            s.rejected += 0 if passed else 1
+            s.seconds += seconds
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """{pipeline: {stage: {"seen", "rejected", "ms"}}}"""
+        with self._lock:
+            return {
+                pipeline: {
+                    name: {"seen": s.seen, "rejected": s.rejected, "ms": round(s.seconds * 1000, 1)}
+                    for name, s in stages.items()
+                }
+                for pipeline, stages in self._stages.items()
+            }
+
+    def log(self):
+        for pipeline, stages in self.snapshot().items():
+            parts = [f"{name} {s['seen']}/-{s['rejected']} {s['ms']}ms" for name, s in stages.items()]
+            print(f"  [Pipeline {pipeline}] " + ", ".join(parts))
+
+
+_local = threading.local() # Collector of the run executing on this thread
+
+
+@contextmanager
+def collecting(collector: PipelineStats):
+    """Entries processed on this thread inside the block are counted into `collector`."""
+    previous = getattr(_local, "collector", None)
+    _local.collector = collector
+    try:
+        yield collector
+    finally:
+        _local.collector = previous
+
+
+def _record(pipeline: str, stage: str, passed: bool, seconds: float):
+    collector = getattr(_local, "collector", None)
+    if collector is not None:
+        collector.record(pipeline, stage, passed, seconds)
+
+
+class EntryPipeline:
+    def __init__(self, name: str, stages: Sequence[Stage], build: Callable[[Candidate], Any]):
+        self.name = name
+        self.stages = sorted(stages, key=lambda s: s.cost)
+        self.build = build
+
+    def process(self, entry, source_name: str = "", extra: Sequence[Stage] = ()):
+        """Runs one entry through all stages. Returns the built item or None if rejected."""
+        stages = sorted([*self.stages, *extra], key=lambda s: s.cost) if extra else self.stages
+        candidate = Candidate(entry=entry, title=entry.title, link=entry.link, source=source_name)
+        for stage in stages:
+            started = time.perf_counter()
+            passed = stage.fn(candidate)
+            _record(self.name, stage.name, passed, time.perf_counter() - started)
+            if not passed:
+                return None
+        return self.build(candidate)
+
+    def process_all(self, entries, source_name: str = "", extra: Sequence[Stage] = ()) -> List:
+        items = []
+        for entry in entries:
+            item = self.process(entry, source_name, extra)
+            if item is not None:
+                items.append(item)
+        return items
+
+
+# --- Generic stages ---
+
+def split_source(default: Optional[str] = None) -> Stage:
+    """Google News titles look like "Title - Source"."""
+    def fn(c: Candidate) -> bool:
+        if " - " in c.title:
+            c.title, c.source = c.title.rsplit(" - ", 1)
+            c.source_in_text = True
+        elif default:
+            c.source = default
+        return True
+    return Stage("split_source", fn, COST_TITLE)
+
+
+def reject_titles(titles: Sequence[str]) -> Stage:
+    """Drops generic pages like "Newsroom" or "Home"."""
+    blocked = set(titles)
+    return Stage("generic_title", lambda c: c.title.strip() not in blocked, COST_TEXT)
+
+
+def reject_terms(terms: Sequence[str], name: str = "junk") -> Stage:
+    """Case-sensitive reject on title / source (e.g. "MyCareersFuture")."""
+    def fn(c: Candidate) -> bool:
+        return not any(t in c.title or t in c.source for t in terms)
+    return Stage(name, fn, COST_TEXT)
+
+
+def reject_body_terms(terms: Sequence[str], name: str = "junk_text") -> Stage:
+    """Case-insensitive reject on title + summary."""
+    def fn(c: Candidate) -> bool:
+        text = c.full_text.lower()
+        return not any(t in text for t in terms)
+    return Stage(name, fn, COST_BODY)
+
+
+def entry_date(entry) -> Optional[datetime]:
+    """Robust Date Parsing: parsed struct_time first, then the raw strings."""
+    if getattr(entry, 'published_parsed', None):
+        return datetime.fromtimestamp(time.mktime(entry.published_parsed))
+    if getattr(entry, 'updated_parsed', None):
+        return datetime.fromtimestamp(time.mktime(entry.updated_parsed))
+    for attr in ('published', 'updated'):
+        raw = getattr(entry, attr, None)
+        if raw:
+            try:
+                return date_parser.parse(raw)
+            except Exception:
+                pass
+    return None
+
+
+def parse_date() -> Stage:
+    def fn(c: Candidate) -> bool:
+        c.pub_date = entry_date(c.entry)
+        return True
+    return Stage("date", fn, COST_DATE)
+
+
+def deep_scan_date(fetch_date: Callable[[str], Optional[datetime]]) -> Stage:
+    """Fallback for entries without a feed date: read the article's meta tags (network)."""
+    def fn(c: Candidate) -> bool:
+        if not c.pub_date:
+            c.pub_date = fetch_date(c.link)
+        return True
+    return Stage("deep_scan_date", fn, COST_NETWORK)
+
+
+def within_days(days: int) -> Stage:
+    """Rejects entries older than the window. Entries without a date count as new."""
+    def fn(c: Candidate) -> bool:
+        if not c.pub_date:
+            return True
+        return c.pub_date >= datetime.utcnow() - timedelta(days=days)
+    return Stage("cutoff", fn, COST_CUTOFF)
+
+
+def clean_summary(max_chars: int = 300, ellipsis: bool = True) -> Stage:
+    def fn(c: Candidate) -> bool:
+        raw = getattr(c.entry, 'summary', '') or getattr(c.entry, 'description', '')
+        # Unescape first to handle &lt; cases
+        text = BeautifulSoup(html.unescape(raw), 'lxml').get_text().strip() if raw else ""
+        c.summary_text = text[:max_chars] + ("..." if ellipsis and len(text) > max_chars else "")
+        return True
+    return Stage("summary", fn, COST_SUMMARY)
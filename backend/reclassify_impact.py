@@ -1,37 +1,50 @@
-
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update
 from database import engine
 from models import NewsItem
+import data_version
 import scorer
+import stats
 
 def reclassify_impact():
     print("Running Impact Reclassification...")
-    
+
     with Session(engine) as session:
-        items = session.exec(select(NewsItem)).all()
-        print(f"Checking {len(items)} items...")
-        
+        # Only the columns the scorer needs (skips embeddings etc.)
+        rows = session.exec(select(NewsItem.id, NewsItem.title, NewsItem.summary, NewsItem.impact_rating)).all()
+        print(f"Checking {len(rows)} items...")
+
+        # Text already scored under the current rules is looked up instead of re-scored
+        memo = scorer.load_memo()
+        fresh = {}
+
         upgraded_count = 0
         total_high = 0
-        
-        for item in items:
-            old_impact = item.impact_rating
-            # Re-run scorer
-            new_impact = scorer.analyze_impact(item.title, item.summary)
-            
+
+        for item_id, title, summary, old_impact in rows:
+            summary = summary or ""
+            key = scorer.memo_key(title, summary)
+            new_impact = memo.get(key) or fresh.get(key)
+            if new_impact is None:
+                # Re-run scorer
+                new_impact = scorer.analyze_impact(title, summary)
+                fresh[key] = new_impact
+
             if new_impact != old_impact:
-                item.impact_rating = new_impact
-                session.add(item)
-                print(f"  [UPDATE] {item.title[:50]}... : {old_impact} -> {new_impact}")
+                session.exec(update(NewsItem).where(NewsItem.id == item_id).values(impact_rating=new_impact))
+                print(f"  [UPDATE] {title[:50]}... : {old_impact} -> {new_impact}")
                 if new_impact == "High":
                     upgraded_count += 1
-            
+
             if new_impact == "High":
                 total_high += 1
-                
+
+        data_version.bump(session) # /news shows impact_rating too
         session.commit()
+        scorer.save_memo(fresh)
+        stats.rebuild() # Bulk update bypasses the per-write dashboard counters
         print("-" * 50)
         print(f"Reclassification Complete.")
+        print(f"Scored: {len(fresh)} (memo hits: {len(rows) - len(fresh)})")
         print(f"Upgraded to High: {upgraded_count}")
         print(f"Total High Impact Items: {total_high}")
 
@@ -0,0 +1,138 @@
+"""
+Response Cache.
+/news, /stats and /brief are answered from a cache instead of the DB while
+nothing has changed:
+1. Keys are endpoint + normalized query params + the data versions it depends on
+   (data_version.py). Every write bumps a version, so all older entries stop matching
+   at once; there is no per-key invalidation and stale entries simply age out
+2. MemoryBackend: per-process LRU (default). CACHE_URL=redis://... shares one cache
+   between API processes (needs the `redis` package); values are stored as JSON
+3. Nothing is cached when the computation raises
+4. etag() derives a strong ETag from the same key: a client holding the current
+   version gets 304 Not Modified before any query runs (not_modified())
+Set RESPONSE_CACHE=0 to disable the cache; ETags are always sent.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence
+from urllib.parse import urlencode
+
+import data_version
+
+ENABLED = os.environ.get("RESPONSE_CACHE", "1") == "1"
+MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "512")) # Per process (memory backend)
+SHARED_TTL = 24 * 3600 # Seconds a shared entry lives; versions move on long before
+KEY_PREFIX = "regwatch:"
+
+
+class MemoryBackend:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        import redis # Optional dependency, only needed for CACHE_URL
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(KEY_PREFIX + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any):
+        self._client.set(KEY_PREFIX + key, json.dumps(value, default=str), ex=SHARED_TTL)
+
+    def clear(self):
+        for key in self._client.scan_iter(KEY_PREFIX + "*"):
+            self._client.delete(key)
+
+
+def _make_backend():
+    url = os.environ.get("CACHE_URL")
+    if url:
+        try:
+            return RedisBackend(url)
+        except Exception as e:
+            print(f"Shared cache unavailable ({e}), using the in-process cache")
+    return MemoryBackend()
+
+
+backend = _make_backend()
+
+
+def key(endpoint: str, params: Dict[str, Any], scopes: Sequence[str] = ("data",)) -> str:
+    """
+    "news:v42:limit=50&sector=Finance", with the versions of `scopes` (data_version.SCOPES).
+    Take the key BEFORE reading the data: a write that lands in between then leaves a
+    newer version behind and the entry is never hit.
+    """
+    normalized = urlencode(sorted((k, v) for k, v in params.items() if v not in (None, "")))
+    versions = ".".join(str(data_version.current(scope)) for scope in scopes)
+    return f"{endpoint}:v{versions}:{normalized}"
+
+
+def get(cache_key: str) -> Optional[Any]:
+    if not ENABLED:
+        return None
+    try:
+        return backend.get(cache_key)
+    except Exception as e:
+        print(f"Cache read failed: {e}")
+        return None
+
+
+def put(cache_key: str, value: Any):
+    """Values must be JSON-serializable (shared backend) and not None."""
+    if not ENABLED or value is None:
+        return
+    try:
+        backend.set(cache_key, value)
+    except Exception as e:
+        print(f"Cache write failed: {e}")
+
+
+def cached(cache_key: str, compute: Callable[[], Any]) -> Any:
+    if not ENABLED:
+        return compute()
+    value = get(cache_key)
+    if value is None:
+        value = compute()
+        put(cache_key, value)
+    return value
+
+
+def etag(cache_key: str) -> str:
+    """Strong ETag: changes with the data version and with every query param."""
+    return '"' + hashlib.blake2b(cache_key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def not_modified(if_none_match: Optional[str], tag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110): W/"x" matches "x"."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == tag for t in if_none_match.split(","))
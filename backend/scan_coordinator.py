@@ -0,0 +1,148 @@
+"""
+Scan Coordinator.
+Single-flight scans: Scan clicks and the hourly trigger no longer start
+overlapping scrapes.
+1. A request the running scan already covers (same or wider sources, no
+   backfill asked for) joins that scan
+2. Anything else is folded into ONE queued follow-up (sources are unioned,
+   full_backfill is OR-ed); the "scrape:pending" dedupe_key keeps it unique, also
+   for a scrape re-queued after its worker died (jobs.register_pending)
+3. jobs.EXCLUSIVE_KINDS stops a second worker from starting it early
+status() reports the running scan's stage, progress and an ETA from the worker's
+heartbeats and recent scrape_run durations.
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, update
+
+from database import engine
+from models import Job, ScrapeRun
+import jobs
+import scrape_runs
+import scraper
+
+PENDING_KEY = "scrape:pending"
+ETA_SAMPLE = 20 # Recent runs used for the typical scan duration
+
+
+def _params(sources: Optional[Iterable[str]], full_backfill: bool, trigger: str) -> Dict:
+    selected = scraper.normalize_sources(sources)
+    return {"sources": sorted(selected) if selected else None, "full_backfill": full_backfill, "trigger": trigger}
+
+
+def _covers(running: Dict, wanted: Dict) -> bool:
+    if wanted["full_backfill"] and not running.get("full_backfill"):
+        return False
+    if running.get("sources") is None:
+        return True
+    return wanted["sources"] is not None and set(wanted["sources"]) <= set(running["sources"])
+
+
+def _merge(queued: Dict, wanted: Dict) -> Dict:
+    sources = None
+    if queued.get("sources") is not None and wanted.get("sources") is not None:
+        sources = sorted(set(queued["sources"]) | set(wanted["sources"]))
+    triggers = {t for params in (queued, wanted) for t in (params.get("trigger") or "").split(",") if t}
+    return {"sources": sources, "full_backfill": bool(queued.get("full_backfill")) or bool(wanted.get("full_backfill")),
+            "trigger": ",".join(sorted(triggers))}
+
+
+# A scrape re-queued after its worker died takes the pending slot back (or joins it)
+jobs.register_pending("scrape", PENDING_KEY, _merge)
+
+
+def request_scan(sources: Optional[Iterable[str]] = None, full_backfill: bool = False,
+                 trigger: str = "manual") -> Dict:
+    """
+    Returns {"job_id", "status": "running" | "queued", "coalesced": bool}.
+    Raises ValueError for unknown sources.
+    """
+    wanted = _params(sources, full_backfill, trigger)
+    while True:
+        with Session(engine) as session:
+            running = session.exec(
+                select(Job).where(Job.kind == "scrape", Job.status == "running").order_by(Job.id.desc())
+            ).first()
+            if running and _covers(running.params or {}, wanted):
+                return {"job_id": running.id, "status": "running", "coalesced": True}
+
+            pending = session.exec(select(Job).where(Job.dedupe_key == PENDING_KEY)).first()
+            if pending:
+                merged = _merge(pending.params or {}, wanted)
+                folded = session.exec(
+                    update(Job).where(Job.id == pending.id, Job.status == "queued").values(params=merged)
+                ).rowcount
+                session.commit()
+                if folded:
+                    return {"job_id": pending.id, "status": "queued", "coalesced": True}
+                continue # Claimed meanwhile: it is the running scan now
+
+            job = Job(kind="scrape", params=wanted, dedupe_key=PENDING_KEY)
+            session.add(job)
+            try:
+                session.commit()
+                return {"job_id": job.id, "status": "queued", "coalesced": False}
+            except IntegrityError:
+                session.rollback() # Someone else queued one first: fold into it
+
+
+def request_scheduled_scan() -> Optional[Dict]:
+    """Hourly trigger; only the first scheduler per clock hour gets through."""
+    slot = datetime.utcnow().strftime("%Y-%m-%dT%H")
+    if not jobs.claim_slot(f"scrape:{slot}"):
+        return None
+    return request_scan(trigger="scheduled")
+
+
+def _typical_duration(session: Session) -> Optional[float]:
+    durations = session.exec(
+        select(ScrapeRun.duration).where(ScrapeRun.status == "ok")
+        .order_by(ScrapeRun.started_at.desc()).limit(ETA_SAMPLE)
+    ).all()
+    return scrape_runs.percentile(list(durations), 50)
+
+
+def _eta(job: Job, typical: Optional[float]) -> Optional[float]:
+    """Seconds left: feed throughput while fetching, else the typical run duration."""
+    elapsed = (datetime.utcnow() - job.started_at).total_seconds()
+    progress = job.progress or {}
+    done, total = progress.get("feeds_done") or 0, progress.get("feeds_total")
+    if progress.get("stage") == "fetching" and total and done:
+        estimate = elapsed / done * (total - done)
+        return round(max(estimate, (typical or 0) - elapsed), 1) if done < total else 0.0
+    if typical is None:
+        return None
+    return round(max(typical - elapsed, 0.0), 1)
+
+
+def _job_summary(job: Job) -> Dict:
+    return {"job_id": job.id, "status": job.status, "params": job.params, "created_at": job.created_at,
+            "started_at": job.started_at, "finished_at": job.finished_at, "error": job.error}
+
+
+def status() -> Dict:
+    with Session(engine) as session:
+        scans: List[Job] = session.exec(
+            select(Job).where(Job.kind == "scrape", Job.status.in_(["running", "queued"])).order_by(Job.id)
+        ).all()
+        running = next((j for j in scans if j.status == "running"), None)
+        queued = next((j for j in scans if j.status == "queued"), None)
+        last = session.exec(select(ScrapeRun).order_by(ScrapeRun.started_at.desc())).first()
+
+        state = {"state": "running" if running else "queued" if queued else "idle",
+                 "running": None, "queued": _job_summary(queued) if queued else None,
+                 "last_run": scrape_runs.brief(last) if last else None}
+        if running:
+            progress = running.progress or {}
+            total = progress.get("feeds_total")
+            eta = _eta(running, _typical_duration(session))
+            state["running"] = {
+                **_job_summary(running),
+                "stage": progress.get("stage", "starting"),
+                "progress": progress,
+                "percent": round(100 * (progress.get("feeds_done") or 0) / total, 1) if total else None,
+                "eta_seconds": eta,
+            }
+        return state
@@ -25,12 +25,33 @@ IMPACT_KEYWORDS = {
     ]
 }
 
+import hashlib
+import json
 import re
+from functools import lru_cache
+from typing import Dict
 
-def analyze_impact(title: str, summary: str) -> str:
-    """Classify news item impact based on keywords."""
-    text = (title + " " + summary).lower()
-    
+from sqlmodel import Session, select, delete
+
+from database import engine
+from models import ImpactMemo
+
+# Bump when the override rules in _classify change. Keyword edits change the version by themselves.
+RULES_REVISION = 1
+RULES_VERSION = f"{RULES_REVISION}-" + hashlib.sha1(json.dumps(IMPACT_KEYWORDS, sort_keys=True).encode()).hexdigest()[:8]
+
+MEMO_SIZE = 8192 # In-process LRU entries
+
+def _tier_pattern(keywords) -> "re.Pattern":
+    # One word boundary alternation per tier, so "billion" doesn't match "bill" or "attractive" match "act"
+    alternation = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(r'\b(?:' + alternation + r')\b')
+
+# Checked in order; the first tier with a hit wins
+TIER_PATTERNS = [(tier, _tier_pattern(IMPACT_KEYWORDS[tier])) for tier in ("High", "Medium", "Low")]
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _classify(text: str) -> str:
     # 0. User Specific Overrides (Learning)
     # "cross border taxis is considered medium"
     if "cross-border taxi" in text or "cross border taxi" in text:
@@ -43,25 +64,34 @@ def analyze_impact(title: str, summary: str) -> str:
     if ("watchdog" in text or "consumer" in text or "cccs" in text) and ("unfair" in text or "misleading" in text or "warns" in text):
         return "Low"
 
-    # 1. Check High
-    for k in IMPACT_KEYWORDS["High"]:
-        # Use simple word boundary regex to avoid "billion" matching "bill" or "attractive" matching "act"
-        # Escape k to handle special chars if any
-        pattern = r'\b' + re.escape(k) + r'\b'
-        if re.search(pattern, text):
-            return "High"
-    
-    # 2. Check Medium
-    for k in IMPACT_KEYWORDS["Medium"]:
-        pattern = r'\b' + re.escape(k) + r'\b'
-        if re.search(pattern, text):
-            return "Medium"
-            
-    # 3. Check Low (Explicit)
-    for k in IMPACT_KEYWORDS["Low"]:
-        pattern = r'\b' + re.escape(k) + r'\b'
-        if re.search(pattern, text):
-            return "Low"
+    # 1. High, 2. Medium, 3. Low (Explicit)
+    for tier, pattern in TIER_PATTERNS:
+        if pattern.search(text):
+            return tier
         
     # Default to Medium if "Ministry" or "Agency" involved, else Low
     return "Medium" 
+
+def analyze_impact(title: str, summary: str) -> str:
+    """Classify news item impact based on keywords."""
+    return _classify((title + " " + summary).lower())
+
+# --- Persistent memo (full-table reclassification) ---
+
+def memo_key(title: str, summary: str) -> str:
+    raw = f"{RULES_VERSION}\0{title}\0{summary}".encode("utf-8", "ignore")
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def load_memo() -> Dict[str, str]:
+    """{memo_key: impact} for the current rules. Rows from older rule versions are dropped."""
+    with Session(engine) as session:
+        session.exec(delete(ImpactMemo).where(ImpactMemo.rules_version != RULES_VERSION))
+        session.commit()
+        return dict(session.exec(select(ImpactMemo.key, ImpactMemo.impact_rating)).all())
+
+def save_memo(results: Dict[str, str]):
+    if not results:
+        return
+    with Session(engine) as session:
+        session.add_all(ImpactMemo(key=k, impact_rating=v, rules_version=RULES_VERSION) for k, v in results.items())
+        session.commit()
@@ -0,0 +1,92 @@
+"""
+Scrape Run Ledger.
+Every scan leaves a `scrape_run` row instead of a single console line:
+1. Run totals: start/end, duration, scraped/added/updated/merged/embedded, errors
+2. Per source: fetch latency, bytes, entries seen, items kept, status / error
+3. Per filter stage (normalize pipelines): entries seen / rejected and time spent
+/runs lists recent runs with p50/p95 durations and the slowest sources, so
+regressions show up as numbers rather than "the scan feels slow".
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlmodel import Session, select
+
+from database import engine
+from models import ScrapeRun
+
+SLOW_SOURCES = 10 # Sources listed in the /runs summary
+
+
+def record(result, trigger: str = "scheduled", full_backfill: bool = False) -> Optional[int]:
+    """Stores an ingest.ScanResult; returns the run ID (None if the ledger is unavailable)."""
+    stats = result.fetch_stats
+    finished = result.finished_at or result.started_at
+    run = ScrapeRun(
+        started_at=result.started_at,
+        finished_at=finished,
+        duration=round((finished - result.started_at).total_seconds(), 3),
+        trigger=trigger,
+        full_backfill=full_backfill,
+        status="error" if result.errors else "ok",
+        scraped=result.scraped,
+        added=result.added,
+        updated=result.updated,
+        merged=result.merged,
+        embedded=result.embedded,
+        feeds=stats.get("feeds", 0),
+        feeds_unchanged=stats.get("feeds_unchanged", 0),
+        feeds_failed=stats.get("feeds_failed", 0),
+        errors=result.errors or None,
+        sources=stats.get("sources"),
+        pipeline=stats.get("pipeline"),
+    )
+    try:
+        with Session(engine) as session:
+            session.add(run)
+            session.commit()
+            return run.id
+    except Exception as e:
+        print(f"Could not record scrape run: {e}")
+        return None
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (pct in 0..100); None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100)) # ceil
+    return ordered[int(rank) - 1]
+
+
+def brief(run: ScrapeRun) -> Dict:
+    return run.model_dump(exclude={"sources", "pipeline"})
+
+
+def summary(session: Session, limit: int = 20) -> Dict:
+    """Recent runs (newest first) with duration percentiles and per-source fetch latency."""
+    runs = session.exec(select(ScrapeRun).order_by(ScrapeRun.started_at.desc()).limit(limit)).all()
+    durations = [r.duration for r in runs]
+
+    latencies = defaultdict(list)
+    failures = defaultdict(int)
+    for run in runs:
+        for source in run.sources or []:
+            if source.get("elapsed") is not None:
+                latencies[source["source"]].append(source["elapsed"])
+            if source.get("error"):
+                failures[source["source"]] += 1
+    slow = sorted(
+        ({"source": name, "runs": len(values), "failures": failures[name],
+          "p50": percentile(values, 50), "p95": percentile(values, 95)}
+         for name, values in latencies.items()),
+        key=lambda s: s["p95"], reverse=True,
+    )
+    return {
+        "count": len(runs),
+        "duration_p50": percentile(durations, 50),
+        "duration_p95": percentile(durations, 95),
+        "slow_sources": slow[:SLOW_SOURCES],
+        "runs": [brief(r) for r in runs],
+    }
@@ -1,9 +1,13 @@
+import bisect
+import itertools
 import random
 import feedparser
 import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass
+import numpy as np
 from models import NewsItem
 from faker import Faker
 import time
@@ -14,6 +18,12 @@ import scorer # Impact logic
 from sqlmodel import Session, select
 from models import NewsItem, UserInterest
 import vector_engine
+import feed_fetcher
+import seen_filter
+import backfill_planner
+import normalize
+import keyword_matcher
+from normalize import EntryPipeline, Stage
 
 fake = Faker()
 
@@ -253,11 +263,10 @@ def is_allowed_source(url: str, source_name: str = "") -> bool:
             if "straits times" in source_lower: return True
             if "channel newsasia" in source_lower or "cna" in source_lower: return True
             if "business times" in source_lower: return True
-            if "business times" in source_lower: return True
             if "edge singapore" in source_lower: return True
             if "business review" in source_lower or "sbr" in source_lower: return True
             if "today" in source_lower: return True
-    return False
+        return False
             
     for allowed in ALLOWED_MATCH_STRINGS:
         if allowed in url_lower:
@@ -310,10 +319,36 @@ def fetch_actual_date_from_url(url: str) -> datetime:
         return None
     return None
 
+# Relevance signals (substring matches on lowercase text)
+STRONG_SIGNALS = [
+    "bill passed", "act passed", "new law", "new rule", "regulatory framework",
+    "compliance", "mandatory", "legislative", "parliament", "amendment",
+    "grant", "subsidy", "levy", "tax", "transformation map", "roadmap",
+    "budget", "minister", "circular", "guideline", "standard", "certification"
+]
+IMPACT_SIGNALS = [
+    "businesses", "smes", "employers", "industry", "sector", "deadline",
+    "eligibility", "criteria", "adopt", "roll out", "launch", "apply"
+]
+FINANCIAL_NOISE = [
+    "market close", "share price", "stock", "equity", "ipo", "listing",
+    "dividend", "earnings", "profit", "revenue", "quarterly", "analyst",
+    "buy rating", "sell rating", "target price", "broker", "investor",
+    "wealth", "billionaire", "rich list", "ranking", "survey", "marathon",
+    "race", "sport", "football", "sanction", "iran", "russia", "war"
+]
+FOREIGN_CONTEXT = [
+    "united states", "usa", "video", "london", "uk", "china", "japan",
+    "malaysia", "thailand", "vietnam", "australia", "hong kong"
+]
+FOREIGN_EXEMPTIONS = ["cross-border", "trade", "export", "import", "agreement"]
+
+RELEVANCE_THRESHOLD = 10
+
 def calculate_relevance_score(text: str, is_gov_source: bool = False) -> int:
     """
     Calculates a relevance score based on weighted semantic signals.
-    Threshold: 15 points.
+    Threshold: RELEVANCE_THRESHOLD. See score_batch() for many texts at once.
     """
     score = 0
     text_lower = text.lower()
@@ -323,13 +358,7 @@ def calculate_relevance_score(text: str, is_gov_source: bool = False) -> int:
         score += 15 
     
     # 2. Strong Regulatory Signals (+10 each)
-    strong_signals = [
-        "bill passed", "act passed", "new law", "new rule", "regulatory framework",
-        "compliance", "mandatory", "legislative", "parliament", "amendment",
-        "grant", "subsidy", "levy", "tax", "transformation map", "roadmap",
-        "budget", "minister", "circular", "guideline", "standard", "certification"
-    ]
-    for sig in strong_signals:
+    for sig in STRONG_SIGNALS:
         if sig in text_lower:
             score += 10
             if score > 30 and not is_gov_source: break 
@@ -346,62 +375,135 @@ def calculate_relevance_score(text: str, is_gov_source: bool = False) -> int:
         score += 5
 
     # 5. Business Impact Signals (+5)
-    impact_signals = [
-        "businesses", "smes", "employers", "industry", "sector", "deadline",
-        "eligibility", "criteria", "adopt", "roll out", "launch", "apply"
-    ]
-    if any(s in text_lower for s in impact_signals):
+    if any(s in text_lower for s in IMPACT_SIGNALS):
         score += 5
 
     # 6. Noise & Financial Penalties (-15 to -20) (Strict)
-    financial_noise = [
-        "market close", "share price", "stock", "equity", "ipo", "listing",
-        "dividend", "earnings", "profit", "revenue", "quarterly", "analyst",
-        "buy rating", "sell rating", "target price", "broker", "investor",
-        "wealth", "billionaire", "rich list", "ranking", "survey", "marathon",
-        "race", "sport", "football", "sanction", "iran", "russia", "war"
-    ]
-    for noise in financial_noise:
+    for noise in FINANCIAL_NOISE:
         if noise in text_lower:
             score -= 20 # Increased penalty to kill noise
             
     # 7. Geographic Penalties (-10)
-    foreign_context = [
-        "united states", "usa", "video", "london", "uk", "china", "japan",
-        "malaysia", "thailand", "vietnam", "australia", "hong kong"
-    ]
-    if any(c in text_lower for c in foreign_context):
-        if not any(x in text_lower for x in ["cross-border", "trade", "export", "import", "agreement"]):
+    if any(c in text_lower for c in FOREIGN_CONTEXT):
+        if not any(x in text_lower for x in FOREIGN_EXEMPTIONS):
             score -= 10
 
     return score
 
+@dataclass
+class RelevanceScores:
+    scores: np.ndarray          # (n,) int, same values as calculate_relevance_score
+    contributions: np.ndarray   # (n, len(signals)) points each signal added to each text
+    signals: List[str]          # Column names, e.g. "gov_source", "strong:tax", "noise:ipo"
+
+    @property
+    def relevant(self) -> np.ndarray:
+        return self.scores >= RELEVANCE_THRESHOLD
+
+    def explain(self, row: int) -> Dict[str, int]:
+        """{signal: points} that made up the score of one text."""
+        cols = np.flatnonzero(self.contributions[row])
+        return {self.signals[c]: int(self.contributions[row, c]) for c in cols}
+
+def _relevance_groups() -> Dict[str, List[str]]:
+    return {
+        "strong": STRONG_SIGNALS,
+        "agency": [a.lower() for a in AGENCY_PATTERNS],
+        "sg": SINGAPORE_CONTEXT_KEYWORDS,
+        "impact": IMPACT_SIGNALS,
+        "noise": FINANCIAL_NOISE,
+        "foreign": FOREIGN_CONTEXT,
+        "exempt": FOREIGN_EXEMPTIONS,
+    }
+
+def _hit_matrix(texts: Sequence[str], keywords: List[str]) -> np.ndarray:
+    """
+    Document x keyword substring hits. The lowercased texts are joined into one UTF-8
+    buffer and each keyword is located with bytes.find (C speed), jumping to the next
+    document after a hit, instead of len(keywords) Python-level `in` checks per text.
+    """
+    docs = [t.lower().encode("utf-8") for t in texts]
+    corpus = b"\0".join(docs)
+    starts = list(itertools.accumulate((len(d) + 1 for d in docs), initial=0))
+    hits = np.zeros((len(docs), len(keywords)), dtype=bool)
+    for col, kw in enumerate(keywords):
+        needle = kw.encode("utf-8")
+        rows = []
+        pos = corpus.find(needle)
+        while pos != -1:
+            row = bisect.bisect_right(starts, pos) - 1
+            rows.append(row)
+            pos = corpus.find(needle, starts[row + 1])
+        hits[rows, col] = True
+    return hits
+
+def _first_hit(hits: np.ndarray) -> np.ndarray:
+    # "any(...)" rules give their points once, credited to the first signal in list order
+    return hits & (np.cumsum(hits, axis=1) == 1)
+
+def score_batch(texts: Sequence[str], is_gov=False) -> RelevanceScores:
+    """
+    calculate_relevance_score for many texts at once: a document x signal hit matrix
+    is built in one go and the weighted rules are applied as matrix operations.
+    `is_gov` is a bool or one bool per text.
+    """
+    groups = _relevance_groups()
+    keywords = list(dict.fromkeys(kw for kws in groups.values() for kw in kws))
+    column = {kw: i for i, kw in enumerate(keywords)}
+    hits = _hit_matrix(texts, keywords)
+    group_hits = {name: hits[:, [column[kw] for kw in kws]] for name, kws in groups.items()}
+    gov = np.broadcast_to(np.asarray(is_gov, dtype=bool), (len(texts),))
+
+    # 2. Strong signals: +10 each; non-gov texts stop counting once past 30 points
+    strong = group_hits["strong"]
+    strong_cap = 30 // 10 + 1
+    strong_credited = strong & (gov[:, None] | (np.cumsum(strong, axis=1) <= strong_cap))
+
+    # 7. Foreign context only counts without a cross-border / trade exemption
+    foreign = _first_hit(group_hits["foreign"]) & ~group_hits["exempt"].any(axis=1)[:, None]
+
+    parts = [
+        (["gov_source"], gov[:, None] * 15),
+        ([f"strong:{kw}" for kw in groups["strong"]], strong_credited * 10),
+        ([f"agency:{kw}" for kw in groups["agency"]], _first_hit(group_hits["agency"]) * 5),
+        ([f"sg:{kw}" for kw in groups["sg"]], _first_hit(group_hits["sg"]) * 5),
+        ([f"impact:{kw}" for kw in groups["impact"]], _first_hit(group_hits["impact"]) * 5),
+        ([f"noise:{kw}" for kw in groups["noise"]], group_hits["noise"] * -20),
+        ([f"foreign:{kw}" for kw in groups["foreign"]], foreign * -10),
+    ]
+    contributions = np.hstack([values.astype(np.int32) for _, values in parts])
+    signals = [name for names, _ in parts for name in names]
+    return RelevanceScores(scores=contributions.sum(axis=1), contributions=contributions, signals=signals)
+
 def is_relevant_business_news(text: str, is_gov_source: bool = False) -> bool:
     score = calculate_relevance_score(text, is_gov_source)
-    # Threshold: 10
+    # Threshold: RELEVANCE_THRESHOLD (10)
     # Allows "Agency" (5) + "Context" (5) = 10 -> Pass
     # "New Law" (10) -> Pass
     # "IPO" (-20) -> Fail
-    return score >= 10
+    return score >= RELEVANCE_THRESHOLD
 
     return False
 
 # For gov.sg we'll use simulation for now or simple HTML check if requests succeed
 # But for the task, let's try a direct scrape of gov.sg news section or fallback to simulation if fails.
 
+_sector_matcher = None
+_sector_fingerprint = None
+
+def sector_matcher() -> keyword_matcher.GroupMatcher:
+    """One automaton over all KEYWORD_MAP lists; rebuilt only if the map was edited."""
+    global _sector_matcher, _sector_fingerprint
+    current = keyword_matcher.fingerprint(KEYWORD_MAP)
+    if _sector_matcher is None or current != _sector_fingerprint:
+        _sector_matcher = keyword_matcher.GroupMatcher(KEYWORD_MAP)
+        _sector_fingerprint = current
+    return _sector_matcher
+
 def classify_sector(text: str, agency: str = "Unknown") -> str:
     # 0. Keyword Scoring (Calculate first to enable Hybrid decisions)
-    text_lower = text.lower()
-    scores = {}
-    for sector, keywords in KEYWORD_MAP.items():
-        score = 0
-        for kw in keywords:
-            # Use Regex Word Boundary to avoid "tech" matching "fintech" or "biotech"
-            # Escape the keyword to handle "+" (e.g. "c++" or similar if any)
-            if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-                score += 1
-        if score > 0:
-            scores[sector] = score
+    # Whole-word matches (\b semantics) so "tech" does not match "fintech" or "biotech"
+    scores = sector_matcher().count(text.lower())
     
     best_keyword_sector = max(scores, key=scores.get) if scores else "General"
 
@@ -439,125 +541,190 @@ def classify_sector(text: str, agency: str = "Unknown") -> str:
     
     return "General"
 
-def extract_agency(text: str) -> str:
-    # Find ALL matches
-    found_agencies = set()
-    text_upper = text.upper()
+# Aliases too generic to imply the Singapore agency on their own ("ESG investing", "US Customs")
+AMBIGUOUS_AGENCY_ALIASES = {"ESG", "Customs", "Central Bank"}
+
+ROLE_PATTERN = re.compile(r"Minister (?:of State |for |of )?([\w\s&]+)", re.IGNORECASE)
+
+_agency_matcher = None
+_agency_fingerprint = None
+
+def agency_matcher() -> keyword_matcher.GroupMatcher:
+    """
+    One automaton over agency acronyms, their full names and the inferred topic keywords
+    (agency -> lowercase terms). Rebuilt only if one of the maps was edited.
+    """
+    global _agency_matcher, _agency_fingerprint
+    current = hash((keyword_matcher.fingerprint(AGENCY_PATTERNS), keyword_matcher.fingerprint(INFERRED_AGENCY_KEYWORDS)))
+    if _agency_matcher is None or current != _agency_fingerprint:
+        terms = {}
+        for code, aliases in AGENCY_PATTERNS.items():
+            names = [a for a in [code, *aliases] if a not in AMBIGUOUS_AGENCY_ALIASES]
+            terms.setdefault(code, []).extend(n.lower() for n in names)
+        for agency, keywords in INFERRED_AGENCY_KEYWORDS.items():
+            terms.setdefault(agency, []).extend(kw.lower() for kw in keywords)
+        _agency_matcher = keyword_matcher.GroupMatcher(terms)
+        _agency_fingerprint = current
+    return _agency_matcher
+
+def _tag_agencies(matcher: keyword_matcher.GroupMatcher, text: str) -> str:
     text_lower = text.lower()
-    
-    # 1. Acronym Matches
-    for code in AGENCY_PATTERNS: # Iterate over keys (acronyms)
-        pattern = r'\b' + re.escape(code) + r'\b'
-        if re.search(pattern, text_upper):
-            found_agencies.add(code)
-    
-    # 2. Role Matches
-    role_match = re.search(r"Minister (?:of State |for |of )?([\w\s&]+)", text, re.IGNORECASE)
-    if role_match:
-        role_text = role_match.group(1)
-        for key, agency in MINISTRY_ROLE_MAP.items():
-            if key.lower() in role_text.lower():
-                found_agencies.add(agency)
-                
-    # 3. Inferred Agencies (If still Unknown or to augment)
-    # Check for strong topic keywords that imply an agency
-    # Only if we haven't found a strong agency? Or additive? 
-    # User wanted "Raising governance" -> MAS. 
-    # Let's make it additive for now.
-    for agency, keywords in INFERRED_AGENCY_KEYWORDS.items():
-        for kw in keywords:
-            if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-                 found_agencies.add(agency)
+    # 1. Acronyms, full names and inferred topic keywords (e.g. "Raising governance" -> MAS), one pass
+    found_agencies = matcher.labels(text_lower)
+
+    # 2. Role Matches ("Minister for Trade" -> MTI); the regex only runs if there is a Minister
+    if "minister " in text_lower:
+        role_match = ROLE_PATTERN.search(text)
+        if role_match:
+            role_text = role_match.group(1).lower()
+            for key, agency in MINISTRY_ROLE_MAP.items():
+                if key.lower() in role_text:
+                    found_agencies.add(agency)
 
     if found_agencies:
-        return ", ".join(sorted(list(found_agencies)))
+        return ", ".join(sorted(found_agencies))
 
     return "Unknown"
 
-def fetch_rss_news(source_name: str, url: str) -> List[NewsItem]:
+def extract_agency(text: str) -> str:
+    # Find ALL matches
+    return _tag_agencies(agency_matcher(), text)
+
+def extract_agencies(texts: Iterable[str]) -> List[str]:
+    """Batch version of extract_agency for backfills: the automaton is looked up once."""
+    matcher = agency_matcher()
+    return [_tag_agencies(matcher, text) for text in texts]
+
+def google_news_rss_url(query: str) -> str:
+    encoded_query = requests.utils.quote(query)
+    return f"https://news.google.com/rss/search?q={encoded_query}&hl=en-SG&gl=SG&ceid=SG:en"
+
+# --- Entry pipelines (stage order by cost, see normalize.py) ---
+
+GENERIC_TITLES = ["Newsroom", "Home", "Media Releases"]
+
+# Agency / Source Keywords that make a Global search result likely Singaporean
+SG_SOURCE_KEYWORDS = ["Ministry", "Authority", "Board", "Council", "Agency", "Commission", "Straits Times", "CNA", "Business Times", "Today", "Edge Singapore", "Gov.sg"]
+
+def _check_whitelist(c) -> bool:
+    # Strict Domain Whitelist
+    return is_allowed_source(c.link, c.source)
+
+def _check_sg_likely(c) -> bool:
+    # Note: the link is often a Google redirect (news.google.com/...), so we rely on Source and Title.
+    if any(k.lower() in c.source.lower() for k in SG_SOURCE_KEYWORDS):
+        return True
+    # Location Keywords in Source or Title (filters Jamaica/Man City)
+    return "Singapore" in c.title or "Singapore" in c.source
+
+def _check_relevance(c) -> bool:
+    c.is_gov = ".gov.sg" in c.link or "gov.sg" in c.source
+    return is_relevant_business_news(c.full_text, c.is_gov)
+
+def _check_content_filter(c) -> bool:
+    # Adaptive Negative Filtering
+    return not vector_engine.is_similar_to_removed(c.full_text)
+
+def _classify(c) -> bool:
+    text = c.full_text
+    c.sector = classify_sector(text)
+    c.agency = extract_agency(text)
+    c.impact_rating = scorer.analyze_impact(c.title, c.summary_text)
+    c.is_circular = "circular" in text.lower() or "circular" in c.link.lower()
+    return True
+
+def _to_news_item(c) -> NewsItem:
+    return NewsItem(
+        title=c.title,
+        summary=c.summary_text,
+        url=c.link,
+        source=c.source,
+        sector=c.sector,
+        agency=c.agency,
+        published_at=c.pub_date or datetime.utcnow(),
+        is_circular=c.is_circular,
+        impact_rating=c.impact_rating
+    )
+
+def not_already_in(items: List[NewsItem]) -> Stage:
+    """Search dedupe: same URL or one title contained in the other."""
+    def fn(c) -> bool:
+        if any(i.url == c.link for i in items):
+            return False
+        title = c.title.lower()
+        return not any(title in i.title.lower() or i.title.lower() in title for i in items)
+    return Stage("dedupe", fn, normalize.COST_DEDUPE)
+
+CLASSIFY_STAGE = Stage("classify", _classify, normalize.COST_CLASSIFY)
+
+# Scan sources: 30-day window, whitelist and relevance threshold
+SCAN_STAGES = [
+    normalize.reject_terms(["MyCareersFuture"]),
+    Stage("whitelist", _check_whitelist, normalize.COST_LINK),
+    normalize.parse_date(),
+    normalize.within_days(30), # User requirement
+    normalize.clean_summary(300),
+    Stage("relevance", _check_relevance, normalize.COST_RELEVANCE),
+    Stage("content_filter", _check_content_filter, normalize.COST_CONTENT),
+    CLASSIFY_STAGE,
+]
+
+RSS_PIPELINE = EntryPipeline("rss", SCAN_STAGES, _to_news_item)
+BACKFILL_PIPELINE = EntryPipeline("backfill", [normalize.split_source(), *SCAN_STAGES], _to_news_item)
+
+# Relaxed relevance for personalized (User explicitly wants this), but still filter pure junk
+INTEREST_PIPELINE = EntryPipeline("interest", [
+    normalize.split_source(),
+    normalize.parse_date(),
+    normalize.clean_summary(200, ellipsis=False),
+    normalize.reject_body_terms(["lottery", "4d"]),
+    Stage("content_filter", _check_content_filter, normalize.COST_CONTENT),
+    CLASSIFY_STAGE,
+], _to_news_item)
+
+# Manual Search Exception: no date limit or relevance threshold
+SEARCH_PIPELINE = EntryPipeline("search", [
+    normalize.split_source(),
+    normalize.parse_date(),
+    normalize.clean_summary(300),
+    normalize.deep_scan_date(fetch_actual_date_from_url),
+    CLASSIFY_STAGE,
+], _to_news_item)
+
+SMART_PIPELINE = EntryPipeline("smart", [
+    normalize.split_source(),
+    normalize.reject_titles(GENERIC_TITLES),
+    normalize.parse_date(),
+    normalize.clean_summary(300),
+    CLASSIFY_STAGE,
+], _to_news_item)
+
+SMART_GLOBAL_PIPELINE = EntryPipeline("smart_global", [
+    normalize.split_source(),
+    normalize.reject_titles(GENERIC_TITLES),
+    Stage("sg_likely", _check_sg_likely, normalize.COST_LINK),
+    normalize.parse_date(),
+    normalize.clean_summary(300),
+    normalize.deep_scan_date(fetch_actual_date_from_url),
+    CLASSIFY_STAGE,
+], _to_news_item)
+
+def fetch_rss_news(source_name: str, url: str, feed=None) -> List[NewsItem]:
+    """Process one RSS feed. Pass a pre-fetched `feed` to skip the download."""
     print(f"Fetching RSS: {source_name}")
     items = []
     try:
-        # Set User Agent to avoid blocking on Cloud (Render)
-        feedparser.USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        feed = feedparser.parse(url)
+        if feed is None:
+            feed = feed_fetcher.fetch_feeds([url])[url].feed
+        if feed is None:
+            return items
         for entry in feed.entries[:10]: # Limit to 10
-            title = entry.title
-            summary = getattr(entry, 'summary', '') or getattr(entry, 'description', '')
-            # Clean summary html
-            import html
-            summary = html.unescape(summary) # Unescape first to handle &lt; cases
-            soup = BeautifulSoup(summary, 'lxml')
-            text_content = soup.get_text().strip()
-            summary_text = text_content[:300] + ("..." if len(text_content) > 300 else "")
-            
-            link = entry.link
-            
-            # Robust Date Parsing
-            pub_date = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                pub_date = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
-            elif hasattr(entry, 'published'):
-                try: pub_date = date_parser.parse(entry.published)
-                except: pass
-            elif hasattr(entry, 'updated'):
-                try: pub_date = date_parser.parse(entry.updated)
-                except: pass
-            
-            if not pub_date:
-                # print(f"  [DATE WARNING] Could not parse date for '{title}'. Defaulting to NOW.")
-                pub_date = datetime.utcnow()
-             
-            # Combined text for analysis
-            full_text = title + " " + summary_text
-            
-            # Filter: 30 days window (User requirement)
-            cutoff_date = datetime.utcnow() - timedelta(days=30)
-            if pub_date < cutoff_date:
-                # print(f"Skipping old article: {title} ({pub_date})")
-                continue
-            
-            # Apply Filter
-            if "MyCareersFuture" in source_name or "MyCareersFuture" in title:
-                continue
-            # Strict Domain Whitelist
-            if not is_allowed_source(link, source_name):
-                continue
-            
-            # Gov sources in RSS? Unlikely for ST/CNA but good practice
-            is_gov = ".gov.sg" in link
-
-            if not is_relevant_business_news(full_text, is_gov):
+            # Already processed by an earlier scan -> one hash lookup
+            if seen_filter.seen_before(entry):
                 continue
-            
-            # Adaptive Negative Filtering
-            if vector_engine.is_similar_to_removed(full_text):
-                print(f"Skipping (Content Filter): {title}")
-                continue
-                
-            sector = classify_sector(full_text)
-            agency = extract_agency(full_text)
-            
-            # Check for circular
-            is_circular = "circular" in full_text.lower()
-            
-            # Impact
-            impact = scorer.analyze_impact(title, summary_text)
-
-            item = NewsItem(
-                title=title,
-                summary=summary_text,
-                url=link,
-                source=source_name,
-                sector=classify_sector(title + " " + summary_text),
-                agency=extract_agency(title + " " + summary_text, link),
-                published_at=pub_date,
-                is_circular="circular" in title.lower() or "circular" in link.lower(),
-                impact_rating=impact
-            )
-            items.append(item)
+            item = RSS_PIPELINE.process(entry, source_name)
+            if item:
+                items.append(item)
     except Exception as e:
         print(f"Error fetching {source_name}: {e}")
     return items
@@ -565,21 +732,17 @@ def fetch_rss_news(source_name: str, url: str) -> List[NewsItem]:
 def fetch_gov_sg() -> List[NewsItem]:
     return [] # Disabled per user request
 
-def fetch_history_backfill() -> List[NewsItem]:
-    """Scans last 30 days for major sources using Google News proxy (Multi-Query Strategy)"""
-    print("Backfilling 30-day history for whitelist sources...")
-    all_items = []
-    seen_urls = set()
-    
+def get_backfill_queries() -> List[str]:
+    """Builds the backfill queries (Multi-Query Strategy). The time window is added by backfill_planner."""
     # Split queries to overcome RSS limits and ensure topic coverage
     site_list = "site:straitstimes.com OR site:channelnewsasia.com OR site:businesstimes.com.sg OR site:theedgesingapore.com"
     
     # Dynamic Query Builder
     queries = [
         # 1. General Regulatory
-        f"({site_list}) (regulation OR policy OR rule OR law OR bill OR 'new requirement') when:30d",
+        f"({site_list}) (regulation OR policy OR rule OR law OR bill OR 'new requirement')",
         # 2. Key Agencies (Broad)
-        f"({site_list}) (SFA OR MOM OR URA OR BCA OR MAS OR LTA OR MOH OR MUIS OR 'Enterprise Singapore') when:30d",
+        f"({site_list}) (SFA OR MOM OR URA OR BCA OR MAS OR LTA OR MOH OR MUIS OR 'Enterprise Singapore')",
     ]
 
     # Dynamically build sector queries using rich KEYWORD_MAP
@@ -601,101 +764,72 @@ def fetch_history_backfill() -> List[NewsItem]:
         
         # Construct query: (site...) AND (Sector1 OR Kw1 OR Sector2 OR Kw2...)
         joined_kws = " OR ".join(batch_keywords)
-        query = f"({site_list}) ({joined_kws}) when:30d"
+        query = f"({site_list}) ({joined_kws})"
         queries.append(query)
 
-    for q_idx, query in enumerate(queries):
-        print(f"  -> Running Backfill Query {q_idx+1}...")
-        encoded_query = requests.utils.quote(query)
-        url = f"https://news.google.com/rss/search?q={encoded_query}&hl=en-SG&gl=SG&ceid=SG:en"
-        
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:60]: # Fetch up to 60 per query
-                link = entry.link
-                if link in seen_urls:
-                    continue
-                seen_urls.add(link)
-
-                title = entry.title
-                
-                # Clean title
-                source_guess = "Google News"
-                if " - " in title:
-                    parts = title.rsplit(" - ", 1)
-                    title = parts[0]
-                    source_guess = parts[1]
-                
-                summary = getattr(entry, 'summary', '') or getattr(entry, 'description', '')
-                soup = BeautifulSoup(summary, 'lxml')
-                summary_text = soup.get_text()[:300] + "..."
-                
-                # Robust Date Parsing
-                pub_date = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    pub_date = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
-                elif hasattr(entry, 'published'):
-                    try: pub_date = date_parser.parse(entry.published)
-                    except: pass
-                elif hasattr(entry, 'updated'):
-                    try: pub_date = date_parser.parse(entry.updated)
-                    except: pass
-                
-                if not pub_date:
-                    # print(f"  [DATE WARNING] Could not parse date for '{title}'. Defaulting to NOW.")
-                    pub_date = datetime.utcnow()
-                    
-                full_text = title + " " + summary_text + " " + source_guess
-                
-                # Filter: 30 days window
-                cutoff_date = datetime.utcnow() - timedelta(days=30)
-                if pub_date < cutoff_date:
-                    continue
-                
-                if "MyCareersFuture" in source_guess or "MyCareersFuture" in title:
-                     continue
+    return queries
 
-                # Strict Domain Whitelist check
-                if not is_allowed_source(link, source_name=source_guess):
-                    continue
-                
-                is_gov = ".gov.sg" in link or "gov.sg" in source_guess
-                if not is_relevant_business_news(full_text, is_gov):
-                    continue
-                
-                # Adaptive Negative Filtering
-                if vector_engine.is_similar_to_removed(full_text):
-                    continue
+def process_backfill_feed(feed, seen_urls: set) -> Tuple[List[NewsItem], int]:
+    """Processes one backfill query's feed. Returns (items, number of new URLs)."""
+    items = []
+    new_count = 0
+    for entry in feed.entries[:60]: # Fetch up to 60 per query
+        if seen_filter.seen_before(entry):
+            continue
+        link = entry.link
+        if link in seen_urls:
+            continue
+        seen_urls.add(link)
+        new_count += 1
+
+        item = BACKFILL_PIPELINE.process(entry, "Google News")
+        if item:
+            items.append(item)
+    return items, new_count
+
+def fetch_history_backfill(feeds=None, planned=None) -> List[NewsItem]:
+    """Scans up to 30 days for major sources using Google News proxy (Multi-Query Strategy)"""
+    print("Backfilling history for whitelist sources...")
+    all_items = []
+    seen_urls = set()
 
-                sector = classify_sector(full_text)
-                agency = extract_agency(full_text)
-                is_circular = "circular" in full_text.lower()
-                
-                item = NewsItem(
-                    title=title,
-                    summary=summary_text,
-                    url=link,
-                    source=source_guess,
-                    sector=sector,
-                    agency=agency,
-                    published_at=pub_date,
-                    is_circular=is_circular
-                )
-                all_items.append(item)
+    # Window per query comes from the planner (full 30d sweep daily, else since last success)
+    if planned is None:
+        planned = backfill_planner.plan(get_backfill_queries())
+    urls = [google_news_rss_url(p.full_query) for p in planned]
+    if feeds is None:
+        feeds = feed_fetcher.fetch_feeds(urls)
+    new_url_counts = {}
+
+    for q_idx, (p, url) in enumerate(zip(planned, urls)):
+        print(f"  -> Running Backfill Query {q_idx+1} (when:{p.window_days}d)...")
+        
+        try:
+            result = feeds[url]
+            if not result.ok:
+                continue
+            new_url_counts[p.key] = 0
+            feed = result.feed
+            if feed is None:
+                continue # Unchanged since last scan
+            items, new_count = process_backfill_feed(feed, seen_urls)
+            new_url_counts[p.key] = new_count
+            all_items.extend(items)
         except Exception as e:
             print(f"Error fetching backfill query {q_idx}: {e}")
+            new_url_counts.pop(p.key, None)
+
+    try:
+        backfill_planner.record(new_url_counts, planned)
+    except Exception as e:
+        print(f"Failed to record backfill state: {e}")
             
     return all_items
 
 # Removed generate_fake_gov_sg to avoid broken links and hallucinations
 
-def fetch_personalized_news() -> List[NewsItem]:
-    """Fetches news based on top User Interests."""
-    print("Fetching Personalized News based on User Interests...")
-    items = []
-    
+def get_personalized_feed_urls() -> Dict[str, str]:
+    """Returns {interest keyword: Google News URL} for the top 5 User Interests."""
     interests = []
     with Session(engine) as session:
         # Get Top 5 interests by score
@@ -703,92 +837,205 @@ def fetch_personalized_news() -> List[NewsItem]:
         
     if not interests:
         print("No user interests found yet.")
-        return []
+        return {}
         
     print(f"Top Interests: {[i.keyword for i in interests]}")
     
-    # Construct queries
-    # To save time, we can group them or run parallel, let's run sequential for now (limit 5)
+    # Construct queries (fetched concurrently by feed_fetcher)
     site_list = "site:straitstimes.com OR site:channelnewsasia.com OR site:businesstimes.com.sg"
+    return {
+        interest.keyword: google_news_rss_url(f"({interest.keyword}) ({site_list}) when:30d")
+        for interest in interests
+    }
+
+def process_interest_feed(feed) -> List[NewsItem]:
+    """Processes one User Interest query's feed."""
+    items = []
+    for entry in feed.entries[:5]: # Top 5 per interest
+        if seen_filter.seen_before(entry):
+            continue
+        # Keep original source name if we can parse it from "Title - Source"
+        item = INTEREST_PIPELINE.process(entry, "Smart Interest")
+        if item:
+            items.append(item)
+    return items
+
+def fetch_personalized_news(interest_urls: Dict[str, str] = None, feeds=None) -> List[NewsItem]:
+    """Fetches news based on top User Interests."""
+    print("Fetching Personalized News based on User Interests...")
+    items = []
     
-    for interest in interests:
+    if interest_urls is None:
+        interest_urls = get_personalized_feed_urls()
+    if not interest_urls:
+        return []
+    if feeds is None:
+        feeds = feed_fetcher.fetch_feeds(list(interest_urls.values()))
+    
+    for keyword, url in interest_urls.items():
         try:
-            query = f"({interest.keyword}) ({site_list}) when:30d"
-            encoded_query = requests.utils.quote(query)
-            url = f"https://news.google.com/rss/search?q={encoded_query}&hl=en-SG&gl=SG&ceid=SG:en"
-            
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:5]: # Top 5 per interest
-                title = entry.title
-                link = entry.link
-                 # Deduplication handled by DB constraint later, but let's check basic
-                
-                summary = getattr(entry, 'summary', '')
-                soup = BeautifulSoup(summary, 'lxml')
-                summary_text = soup.get_text().strip()[:200]
-                
-                # Date
-                pub_date = datetime.utcnow()
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                
-                full_text = title + " " + summary_text
-                
-                # Relaxed relevance for personalized (User explicitly wants this)
-                # But still filter pure junk
-                if "lottery" in full_text.lower() or "4d" in full_text.lower(): continue
-
-                # Adaptive Negative Filtering (Crucial for learning what NOT to show even in interests)
-                if vector_engine.is_similar_to_removed(full_text):
-                    print(f"Skipping Interest Item (Content Filter): {title}")
-                    continue
-
-                item = NewsItem(
-                    title=title,
-                    summary=summary_text,
-                    url=link,
-                    source="Smart Interest", # Mark source for visibility or debugging? Or keep original? 
-                    # Let's keep original source name if we can parse it, else "Google News (Interest)"
-                    sector=classify_sector(full_text),
-                    agency=extract_agency(full_text),
-                    published_at=pub_date,
-                    impact_rating=scorer.analyze_impact(title, summary_text)
-                )
-                # Parse source from title "Title - Source"
-                if " - " in title:
-                    item.source = title.rsplit(" - ", 1)[1]
-                    item.title = title.rsplit(" - ", 1)[0]
-                    
-                items.append(item)
+            feed = feeds[url].feed
+            if feed is None:
+                continue
+            items.extend(process_interest_feed(feed))
         except Exception as e:
-            print(f"Error fetching interest '{interest.keyword}': {e}")
+            print(f"Error fetching interest '{keyword}': {e}")
             
     return items
 
-def fetch_news() -> List[NewsItem]:
+# Display source name for each RSS feed
+RSS_SOURCES = [
+    ("The Straits Times", RSS_FEEDS["The Straits Times"]),
+    ("The Straits Times", RSS_FEEDS["The Straits Times (SG)"]),
+    ("CNA", RSS_FEEDS["CNA"]),
+    ("CNA", RSS_FEEDS["CNA (SG)"]),
+]
+
+# Source selectors accepted by iter_news(sources=...) / POST /scan?source=
+SOURCE_KINDS = ("gov", "rss", "interests", "backfill")
+
+def scan_source_names() -> List[str]:
+    return list(SOURCE_KINDS) + sorted({name for name, _ in RSS_SOURCES})
+
+def normalize_sources(sources: Optional[Iterable[str]]) -> Optional[Set[str]]:
+    """Lower-cased selector set, None for "everything". Raises ValueError for unknown names."""
+    if not sources:
+        return None
+    known = {name.lower() for name in scan_source_names()}
+    selected = {s.strip().lower() for s in sources if s and s.strip()}
+    unknown = selected - known
+    if unknown:
+        raise ValueError(f"Unknown sources: {', '.join(sorted(unknown))}")
+    return selected or None
+
+def iter_news(stats: Dict = None, full_backfill: bool = False,
+              sources: Optional[Iterable[str]] = None, deferred: Dict = None) -> Iterator[List[NewsItem]]:
+    """
+    Runs a full scan, yielding each source's items as soon as its feed is parsed.
+    Pass a `stats` dict to receive feed counters and per-source timings (filled once the
+    generator is exhausted; "feeds_total" / "feeds_done" are kept current during the scan).
+    full_backfill=True forces the 30-day backfill sweep for every query.
+    sources limits the scan to some of scan_source_names() (e.g. ["gov", "CNA"]).
+    Pass a `deferred` dict to keep feed validators and backfill progress unsaved until the
+    caller has stored the items: call commit_deferred(deferred) once they are written,
+    drop it otherwise. Without it both are saved when the generator is exhausted.
+    """
+    # Stage counters of this scan only (searches running meanwhile count separately)
+    pipeline_stats = normalize.PipelineStats()
+    with normalize.collecting(pipeline_stats):
+        yield from _scan_feeds(stats, full_backfill, sources, deferred, pipeline_stats)
+
+def _scan_feeds(stats: Optional[Dict], full_backfill: bool, sources: Optional[Iterable[str]],
+                deferred: Optional[Dict], pipeline_stats: normalize.PipelineStats) -> Iterator[List[NewsItem]]:
+    selected = normalize_sources(sources)
+
+    def wanted(kind: str, name: str = "") -> bool:
+        return selected is None or kind in selected or name.lower() in selected
+
     # Pre-load rejected vector cache
     vector_engine.load_rejected_embeddings()
-    all_news = []
-    
-    # 1. Real RSS
-    all_news.extend(fetch_rss_news("The Straits Times", RSS_FEEDS["The Straits Times"]))
-    all_news.extend(fetch_rss_news("The Straits Times", RSS_FEEDS["The Straits Times (SG)"]))
-    all_news.extend(fetch_rss_news("CNA", RSS_FEEDS["CNA"]))
-    all_news.extend(fetch_rss_news("CNA", RSS_FEEDS["CNA (SG)"]))
-    
-    # 2. Business Times (Try RSS if valid, else skip)
-    # bt_news = fetch_rss_news("The Business Times", "https://www.businesstimes.com.sg/rss.xml")
-    # all_news.extend(bt_news)
-    
-    # 3. Gov.sg (Hybrid)
-    all_news.extend(fetch_gov_sg())
+    seen_filter.reset_pending()
 
-    # 4. Personalised / Smart Interests
-    all_news.extend(fetch_personalized_news())
+    # Every feed of this scan is downloaded at once; wall time ~ slowest single feed
+    interest_urls = get_personalized_feed_urls() if wanted("interests") else {}
+    planned_backfill = backfill_planner.plan(get_backfill_queries(), force_full=full_backfill) if wanted("backfill") else []
 
-    # 4. Backfill History (Straits Times, CNA, etc. - last 30 days)
-    all_news.extend(fetch_history_backfill())
-    
+    # url -> [(kind, arg)] (one URL may serve several handlers)
+    handlers = {}
+    # 1. Real RSS
+    for source_name, url in RSS_SOURCES:
+        if wanted("rss", source_name):
+            handlers.setdefault(url, []).append(("rss", source_name))
+    # 2. Personalised / Smart Interests
+    for keyword, url in interest_urls.items():
+        handlers.setdefault(url, []).append(("interest", keyword))
+    # 3. Backfill History (Straits Times, CNA, etc.)
+    for p in planned_backfill:
+        handlers.setdefault(google_news_rss_url(p.full_query), []).append(("backfill", p))
+    if stats is not None:
+        stats["feeds_total"] = len(handlers)
+        stats["feeds_done"] = 0
+
+    # 4. Gov.sg (Hybrid)
+    if wanted("gov"):
+        gov_items = fetch_gov_sg()
+        if gov_items:
+            yield gov_items
+
+    backfill_seen_urls = set()
+    new_url_counts = {}
+    results = []
+    feed_log = [] # Per-feed record for the scrape run ledger
+    # Conditional GET: feeds unchanged since the last scan are not re-parsed
+    for result in feed_fetcher.iter_feeds(list(handlers), conditional=True):
+        results.append(result)
+        source = {
+            "source": "; ".join(f"{kind}:{getattr(arg, 'query', arg)}" for kind, arg in handlers[result.url]),
+            "url": result.url,
+            "status": result.status,
+            "elapsed": round(result.elapsed, 3),
+            "bytes": result.bytes,
+            "entries": len(result.entries),
+            "not_modified": result.not_modified,
+            "error": result.error,
+            "items": 0,
+        }
+        feed_log.append(source)
+        if stats is not None:
+            stats["feeds_done"] = len(results)
+        for kind, arg in handlers[result.url]:
+            if kind == "backfill" and result.ok:
+                new_url_counts[arg.key] = 0
+            if result.feed is None:
+                continue # Failed or unchanged
+            try:
+                if kind == "rss":
+                    items = fetch_rss_news(arg, result.url, feed=result.feed)
+                elif kind == "interest":
+                    items = process_interest_feed(result.feed)
+                else:
+                    items, new_url_counts[arg.key] = process_backfill_feed(result.feed, backfill_seen_urls)
+            except Exception as e:
+                print(f"Error processing {kind} feed {result.url[:80]}: {e}")
+                new_url_counts.pop(getattr(arg, "key", None), None)
+                continue
+            if items:
+                source["items"] += len(items)
+                yield items
+
+    # Entries of changed feeds are processed; their validators and the backfill progress
+    # (which shrinks the next backfill window) are saved once the items are written
+    if deferred is not None:
+        deferred["validators"] = results
+        deferred["backfill"] = (new_url_counts, planned_backfill)
+    else:
+        commit_deferred({"validators": results, "backfill": (new_url_counts, planned_backfill)})
+
+    # Where scan CPU went (entries seen / rejected / time per stage)
+    pipeline_stats.log()
+
+    if stats is not None:
+        stats["pipeline"] = pipeline_stats.snapshot()
+        stats["feeds"] = len(results)
+        stats["feeds_unchanged"] = sum(1 for r in results if r.not_modified)
+        stats["feeds_failed"] = sum(1 for r in results if not r.ok)
+        stats["sources"] = feed_log
+
+def commit_deferred(deferred: Dict):
+    """Saves what iter_news(deferred=...) held back; call after its items are written."""
+    if deferred.get("validators"):
+        feed_fetcher.save_validators(deferred["validators"])
+    if deferred.get("backfill"):
+        try:
+            backfill_planner.record(*deferred["backfill"])
+        except Exception as e:
+            print(f"Failed to record backfill state: {e}")
+
+def fetch_news(stats: Dict = None, full_backfill: bool = False) -> List[NewsItem]:
+    """Runs a full scan and returns all items at once (see iter_news)."""
+    all_news = []
+    for items in iter_news(stats, full_backfill):
+        all_news.extend(items)
     return all_news
 
 # Intelligent Search Expansion
@@ -873,73 +1120,9 @@ def search_news(user_query: str) -> Dict:
     # print(f"DEBUG: Search URL: {url}")
     
     try:
-        feed = feedparser.parse(url)
-        for entry in feed.entries[:20]: # Fetch up to 20 for search
-            title = entry.title
-            
-            # Clean title
-            source_guess = "Google News"
-            if " - " in title:
-                parts = title.rsplit(" - ", 1)
-                title = parts[0]
-                source_guess = parts[1]
-
-            link = entry.link
-            
-            summary = getattr(entry, 'summary', '') or getattr(entry, 'description', '')
-            soup = BeautifulSoup(summary, 'lxml')
-            summary_text = soup.get_text()[:300] + "..."
-            
-            # Robust Date Parsing with Debugging
-            pub_date = None
-            print(f"DEBUG_DATE: Title='{title}'")
-            print(f"  Raw Published: {getattr(entry, 'published', 'N/A')}")
-            print(f"  Raw Updated: {getattr(entry, 'updated', 'N/A')}")
-            
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                print(f"  -> Used published_parsed: {pub_date}")
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                pub_date = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
-                print(f"  -> Used updated_parsed: {pub_date}")
-            elif hasattr(entry, 'published'):
-                try: 
-                    pub_date = date_parser.parse(entry.published)
-                    print(f"  -> Parsed string published: {pub_date}")
-                except Exception as e: print(f"  -> Failed parse published: {e}")
-            elif hasattr(entry, 'updated'):
-                try: 
-                    pub_date = date_parser.parse(entry.updated)
-                    print(f"  -> Parsed string updated: {pub_date}")
-                except Exception as e: print(f"  -> Failed parse updated: {e}")
-            
-            if not pub_date:
-                print(f"  -> RSS Date missing. Attempting Deep Scan...")
-                # Use current entry.link which is Google redirect, requests will follow it
-                pub_date = fetch_actual_date_from_url(link)
-                
-            if not pub_date:
-                print(f"  -> Deep Scan Failed. Defaulting to NOW.")
-                pub_date = datetime.utcnow()
-            
-            full_text = title + " " + summary_text + " " + source_guess
-            
-            sector = classify_sector(full_text)
-            agency = extract_agency(full_text)
-            is_circular = "circular" in full_text.lower()
-
-            item = NewsItem(
-                title=title,
-                summary=summary_text,
-                url=link,
-                source=source_guess,
-                sector=sector,
-                agency=agency,
-                published_at=pub_date,
-                is_circular=is_circular
-            )
-            items.append(item)
-            
+        feed = feedparser.parse(url, agent=feed_fetcher.USER_AGENT)
+        # Fetch up to 20 for search (Deep Scan fallback for missing dates)
+        items.extend(SEARCH_PIPELINE.process_all(feed.entries[:20], "Google News"))
     except Exception as e:
         print(f"Error searching: {e}")
 
@@ -979,41 +1162,15 @@ def search_news(user_query: str) -> Dict:
 
         def fetch_smart_items(url_to_fetch, label="Restricted"):
             try:
-                feed = feedparser.parse(url_to_fetch)
+                feed = feedparser.parse(url_to_fetch, agent=feed_fetcher.USER_AGENT)
                 for entry in feed.entries[:10]: 
-                    title = entry.title
-                    # Ignore generic "Newsroom" or "Home" titles
-                    if title.strip() in ["Newsroom", "Home", "Media Releases"]:
+                    # Deduplicate against results so far
+                    item = SMART_PIPELINE.process(entry, "Google News", extra=[not_already_in(items)])
+                    if not item:
                         continue
-
-                    source_guess = "Google News"
-                    if " - " in title:
-                        parts = title.rsplit(" - ", 1)
-                        title = parts[0]
-                        source_guess = parts[1]
-                    
-                    full_text = title + " " + getattr(entry, 'summary', '')
-                    
-                    # Deduplicate
-                    if any(i.url == entry.link for i in items): continue
-                    if any(title.lower() in i.title.lower() or i.title.lower() in title.lower() for i in items): continue
-
-                    sector = classify_sector(full_text)
-                    agency = extract_agency(full_text)
-                    
-                    item = NewsItem(
-                        title=title,
-                        summary=entry.summary if hasattr(entry, 'summary') else title,
-                        url=entry.link,
-                        source=source_guess,
-                        sector=sector,
-                        agency=agency,
-                        published_at=datetime.utcnow(), 
-                        is_circular=False
-                    )
                     items.append(item)
                     found_smart_items.append(item)
-                    print(f"  -> Added Smart Result ({label}): {title}")
+                    print(f"  -> Added Smart Result ({label}): {item.title}")
             except Exception as e:
                 print(f"Smart Search ({label}) error: {e}")
 
@@ -1031,77 +1188,14 @@ def search_news(user_query: str) -> Dict:
         # We need to be careful with Global results. 
         # Strategy: Fetch them, but prioritize SG content.
         try:
-            feed = feedparser.parse(fb_url_global)
+            feed = feedparser.parse(fb_url_global, agent=feed_fetcher.USER_AGENT)
             for entry in feed.entries[:15]: # Expanded to 15 to catch MTI if ranked lower
-                title = entry.title
-                if title.strip() in ["Newsroom", "Home", "Media Releases"]: continue
-
-                source_guess = "Google News"
-                if " - " in title:
-                    parts = title.rsplit(" - ", 1)
-                    title = parts[0]
-                    source_guess = parts[1]
-                
-                # Global Filter: Prefer SG domains or known entities
-                # Note: "entry.link" is often a Google redirect (news.google.com/...), so .sg check usually fails there.
-                # We rely on Source Guess and Title.
-                
-                is_sg_likely = False
-                
-                # Agency / Source Keywords
-                sg_source_keywords = ["Ministry", "Authority", "Board", "Council", "Agency", "Commission", "Straits Times", "CNA", "Business Times", "Today", "Edge Singapore", "Gov.sg"]
-                if any(k.lower() in source_guess.lower() for k in sg_source_keywords):
-                    is_sg_likely = True
-                
-                # Location Keywords in Source or Title
-                if "Singapore" in title or "Singapore" in source_guess:
-                    is_sg_likely = True
-                    
-                # Specific overrides for user queries (e.g. PEP Awards is strictly SG logic usually? No, global.)
-                # If source ends with .sg in display name (rare)
-                
-                # If not clearly SG, skip it (filters Jamaica/Man City)
-                if not is_sg_likely:
+                # Global Filter: Prefer SG domains or known entities, then deduplicate
+                item = SMART_GLOBAL_PIPELINE.process(entry, "Google News", extra=[not_already_in(items)])
+                if not item:
                     continue
-
-                full_text = title + " " + getattr(entry, 'summary', '')
-                
-                # Deduplicate
-                if any(i.url == entry.link for i in items): continue
-                if any(title.lower() in i.title.lower() or i.title.lower() in title.lower() for i in items): continue
-
-                sector = classify_sector(full_text)
-                agency = extract_agency(full_text)
-                
-                # Robust Date Parsing
-                pub_date = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    pub_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    pub_date = datetime.fromtimestamp(time.mktime(entry.updated_parsed))
-                elif hasattr(entry, 'published'):
-                     try: pub_date = date_parser.parse(entry.published)
-                     except: pass
-                
-                if not pub_date:
-                     print(f"  -> Global Fallback Date missing. Deep Scan...")
-                     pub_date = fetch_actual_date_from_url(entry.link)
-                     
-                if not pub_date:
-                     pub_date = datetime.utcnow()
-
-                item = NewsItem(
-                    title=title,
-                    summary=entry.summary if hasattr(entry, 'summary') else title,
-                    url=entry.link,
-                    source=source_guess,
-                    sector=sector,
-                    agency=agency,
-                    published_at=pub_date, 
-                    is_circular=False
-                )
                 items.append(item)
-                print(f"  -> Added Smart Global Result: {title}")
+                print(f"  -> Added Smart Global Result: {item.title}")
         except Exception as e:
             print(f"Smart Global error: {e}")
 
@@ -0,0 +1,84 @@
+"""
+Seen-Entry Filter.
+Remembers every feed entry a scan has already processed, keyed by GUID/link plus
+a hash of its title and summary, so later scans skip HTML cleaning, scoring and
+classification for it. Changed entries (edited title/summary) hash differently
+and are processed again.
+Backed by the `seenentry` table and rebuilt into an in-memory set at startup.
+An exact set is used instead of a Bloom filter: a false positive would silently
+drop a new article.
+"""
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Set
+
+from sqlmodel import Session, select, delete
+
+from database import engine
+from models import SeenEntry
+
+# Bump to re-process every entry (e.g. after changing relevance rules)
+FILTER_VERSION = "1"
+RETENTION_DAYS = 45 # Entries older than the 30-day scan window can't come back
+
+_seen: Set[str] = set()
+_pending: Set[str] = set()
+_loaded = False
+_lock = threading.Lock()
+
+
+def entry_key(entry) -> str:
+    ident = getattr(entry, 'id', '') or getattr(entry, 'link', '')
+    content = (getattr(entry, 'title', '') or '') + "\0" + (getattr(entry, 'summary', '') or '')
+    raw = f"{FILTER_VERSION}\0{ident}\0{content}".encode("utf-8", "ignore")
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def load():
+    """(Re)build the in-memory set from the DB, dropping expired keys."""
+    global _seen, _loaded
+    with _lock:
+        with Session(engine) as session:
+            cutoff = datetime.utcnow() - timedelta(days=RETENTION_DAYS)
+            session.exec(delete(SeenEntry).where(SeenEntry.seen_at < cutoff))
+            session.commit()
+            _seen = set(session.exec(select(SeenEntry.key)).all())
+        _loaded = True
+    print(f"Seen filter loaded: {len(_seen)} entries")
+
+
+def seen_before(entry) -> bool:
+    """True if this exact entry was processed by an earlier scan. Marks it otherwise."""
+    global _loaded
+    if not _loaded:
+        try:
+            load()
+        except Exception as e:
+            # Degrade to "nothing seen" for this process instead of failing the scan
+            print(f"Seen filter unavailable: {e}")
+            _loaded = True
+    key = entry_key(entry)
+    if key in _seen:
+        return True
+    _pending.add(key)
+    return False
+
+
+def reset_pending():
+    _pending.clear()
+
+
+def commit():
+    """Persist entries marked during this scan. Call once the scan's items are saved."""
+    with _lock:
+        new_keys = _pending - _seen
+        _pending.clear()
+        if not new_keys:
+            return
+        with Session(engine) as session:
+            now = datetime.utcnow()
+            for key in new_keys:
+                session.merge(SeenEntry(key=key, seen_at=now))
+            session.commit()
+        _seen.update(new_keys)
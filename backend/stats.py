@@ -0,0 +1,297 @@
+"""
+Dashboard Stats.
+/stats used to load every visible NewsItem (embeddings included) and count in
+Python. Now:
+1. _visible_counts(): one GROUP BY (impact, sector, agency) over the covering
+   ix_newsitem_stats index; the result has one row per combination, not per item
+2. stats_counter: the same combinations as a table, updated in the write's own
+   transaction (ingest, hide, restore, manual edits) through tracking(), so
+   /stats reads a few hundred rows whatever the size of newsitem
+3. daily_rollup: the same counts per published day and source, maintained by the
+   same tracking() diff; timeseries() buckets it by day / week / month. Agencies are
+   split like item_agency, so ?agency=LTA matches "LTA, MOT" items as /news does;
+   group_by=agency reports them under the names /stats uses
+4. rebuild() recomputes counters and rollups from newsitem; it runs at startup and
+   hourly on the leader, which also absorbs edits made by scripts that bypass tracking().
+   It locks out tracking() writers while it runs, so no delta falls between its
+   snapshot and the replace. Only a rebuild that changed rows bumps a version, and only
+   the "stats" one (data_version.SCOPES), so it never invalidates cached /news pages
+Set STATS_COUNTERS=0 to always answer /stats from (1).
+"""
+import os
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlmodel import Session, select, delete, func
+
+from database import engine, dialect_insert
+from models import DailyRollup, NewsItem, StatsCounter
+import agency_index
+import data_version
+
+USE_COUNTERS = os.environ.get("STATS_COUNTERS", "1") == "1"
+TOP_N = 5 # Sectors / agencies returned
+
+GRANULARITIES = ("day", "week", "month")
+DIMENSIONS = ("impact_rating", "sector", "agency", "source")
+MAX_BUCKETS = 1000
+NO_AGENCY = "unknown" # Rollup key of items without an agency, same as those tagged "Unknown"
+
+Key = Tuple[str, str, str]                  # (impact_rating, sector, agency)
+RollupKey = Tuple[date, str, str, str, str] # (day, impact_rating, sector, agency, source)
+
+
+def _visible_counts(session: Session, where=None, impact: Optional[str] = None) -> Counter:
+    query = (select(NewsItem.impact_rating, NewsItem.sector, NewsItem.agency, func.count())
+             .where(NewsItem.is_hidden == False)
+             .group_by(NewsItem.impact_rating, NewsItem.sector, NewsItem.agency))
+    if where is not None:
+        query = query.where(where)
+    if impact:
+        query = query.where(NewsItem.impact_rating == impact)
+    return Counter({(i or "", s or "", a or ""): n for i, s, a, n in session.exec(query).all()})
+
+
+def _day(value) -> date:
+    # func.date() is a date on Postgres and a "YYYY-MM-DD" string on SQLite
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _visible_rollup(session: Session, where=None) -> Counter:
+    day = func.date(NewsItem.published_at)
+    query = (select(day, NewsItem.impact_rating, NewsItem.sector, NewsItem.agency, NewsItem.source, func.count())
+             .where(NewsItem.is_hidden == False)
+             .group_by(day, NewsItem.impact_rating, NewsItem.sector, NewsItem.agency, NewsItem.source))
+    if where is not None:
+        query = query.where(where)
+    return Counter({(_day(d), i or "", s or "", a or "", src or ""): n
+                    for d, i, s, a, src, n in session.exec(query).all()})
+
+
+def _by_agency(rollup: Counter) -> Counter:
+    """daily_rollup rows: one (day, impact, sector, agency, source, lead) key per listed agency."""
+    rows = Counter()
+    for (d, i, s, a, src), n in rollup.items():
+        for k, agency in enumerate(agency_index.split_agencies(a) or [NO_AGENCY]):
+            rows[(d, i, s, agency, src, k == 0)] += n
+    return rows
+
+
+def _project(rollup: Counter) -> Counter:
+    counts = Counter()
+    for (_, i, s, a, _), n in rollup.items():
+        counts[(i, s, a)] += n
+    return counts
+
+
+def _agency_names(session: Session) -> Dict[str, str]:
+    """Rollup key -> the spelling /stats shows most ("lta" -> "LTA"), from stats_counter."""
+    spellings = defaultdict(Counter)
+    for agency, n in session.exec(select(StatsCounter.agency, StatsCounter.count).where(StatsCounter.count > 0)).all():
+        for name in (a.strip() for a in (agency or "").split(",")):
+            if name:
+                spellings[name.lower()][name] += n
+    names = {key: max(c.items(), key=lambda x: (x[1], x[0]))[0] for key, c in spellings.items()}
+    names.setdefault(NO_AGENCY, "Unknown")
+    return names
+
+
+def _counter_counts(session: Session, impact: Optional[str] = None) -> Counter:
+    query = select(StatsCounter).where(StatsCounter.count > 0)
+    if impact:
+        query = query.where(StatsCounter.impact_rating == impact)
+    return Counter({(c.impact_rating, c.sector, c.agency): c.count for c in session.exec(query).all()})
+
+
+def _summarize(counts: Counter) -> Dict:
+    impact, sectors, agencies = Counter(), Counter(), Counter()
+    for (i, s, a), n in counts.items():
+        impact[i] += n
+        if s:
+            sectors[s] += n
+        if a:
+            agencies[a] += n
+
+    def top(c: Counter):
+        # Highest count first, ties by name (stable across both sources)
+        return [{"name": k, "value": v} for k, v in sorted(c.items(), key=lambda x: (-x[1], x[0]))[:TOP_N]]
+
+    return {
+        "total": sum(counts.values()),
+        "impact": [{"name": k, "value": v} for k, v in impact.items()],
+        "sectors": top(sectors),
+        "agencies": top(agencies),
+    }
+
+
+def get_stats(session: Session, impact: Optional[str] = None) -> Dict:
+    """{"total", "impact", "sectors" (top 5), "agencies" (top 5)} for visible items."""
+    impact = None if impact in (None, "", "All") else impact
+    counts = None
+    if USE_COUNTERS:
+        counts = _counter_counts(session, impact)
+        if not counts and session.exec(select(func.count()).select_from(StatsCounter)).one() == 0:
+            counts = None # Not built yet
+    if counts is None:
+        counts = _visible_counts(session, impact=impact)
+    return _summarize(counts)
+
+
+def _upsert_counts(session: Session, table, key_columns, rows: List[Dict]):
+    if not rows:
+        return
+    stmt = dialect_insert(table).values(rows)
+    session.exec(stmt.on_conflict_do_update(
+        index_elements=key_columns, set_={"count": table.c.count + stmt.excluded.count},
+    ))
+
+
+def apply(session: Session, delta: Counter):
+    """Adds signed per-(day, impact, sector, agency, source) deltas to the counters and rollups."""
+    rollup_rows = [{"day": d, "impact_rating": i, "sector": s, "agency": a, "source": src, "lead": lead, "count": n}
+                   for (d, i, s, a, src, lead), n in _by_agency(delta).items() if n]
+    counter_rows = [{"impact_rating": i, "sector": s, "agency": a, "count": n}
+                    for (i, s, a), n in _project(delta).items() if n]
+    _upsert_counts(session, StatsCounter.__table__, ["impact_rating", "sector", "agency"], counter_rows)
+    _upsert_counts(session, DailyRollup.__table__, ["day", "impact_rating", "sector", "agency", "source", "lead"],
+                   rollup_rows)
+
+
+@contextmanager
+def tracking(session: Session, where):
+    """
+    Wraps a write to the items matching `where` (e.g. NewsItem.id == 5): their visible
+    counts are taken before and after, and the difference is applied to the counters.
+    Commit after the block.
+    """
+    before = _visible_rollup(session, where)
+    yield
+    session.flush()
+    delta = _visible_rollup(session, where)
+    delta.subtract(before)
+    apply(session, delta)
+
+
+def _bucket(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday()) # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(bucket: date, granularity: str) -> date:
+    if granularity == "week":
+        return bucket + timedelta(days=7)
+    if granularity == "month":
+        return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return bucket + timedelta(days=1)
+
+
+def timeseries(session: Session, start: date, end: date, granularity: str = "day",
+               group_by: Optional[str] = None, filters: Optional[Dict[str, str]] = None) -> Dict:
+    """
+    Visible items per bucket between start and end (inclusive, published day in UTC),
+    read from daily_rollup. Every bucket of the range is present, empty ones with 0.
+    group_by splits each bucket by a dimension; filters restrict dimensions to one value.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    if group_by is not None and group_by not in DIMENSIONS:
+        raise ValueError(f"group_by must be one of {', '.join(DIMENSIONS)}")
+    if end < start:
+        raise ValueError("end is before start")
+
+    buckets = []
+    bucket = _bucket(start, granularity)
+    while bucket <= end:
+        buckets.append(bucket)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f"More than {MAX_BUCKETS} buckets; use a coarser granularity")
+        bucket = _next_bucket(bucket, granularity)
+
+    filters = dict(filters or {})
+    if filters.get("agency"):
+        filters["agency"] = filters["agency"].strip().lower() # Index keys, as item_agency
+    columns = [DailyRollup.day, DailyRollup.lead] + ([getattr(DailyRollup, group_by)] if group_by else [])
+    query = (select(*columns, func.sum(DailyRollup.count))
+             .where(DailyRollup.day >= start, DailyRollup.day <= end, DailyRollup.count != 0)
+             .group_by(*columns))
+    for name, value in filters.items():
+        query = query.where(getattr(DailyRollup, name) == value)
+    if group_by != "agency" and "agency" not in filters:
+        query = query.where(DailyRollup.lead == True) # One row per item
+
+    names = _agency_names(session) if group_by == "agency" else {}
+    totals = Counter()
+    split = defaultdict(Counter)
+    for row in session.exec(query).all():
+        b = _bucket(_day(row[0]), granularity)
+        if row[1] or "agency" in filters: # An item has at most one row per agency
+            totals[b] += row[-1]
+        if group_by == "agency":
+            split[b][names.get(row[2], row[2].upper())] += row[-1]
+        elif group_by:
+            split[b][row[2] or "Unknown"] += row[-1]
+
+    series = []
+    for b in buckets:
+        point = {"bucket": b.isoformat(), "total": totals[b]}
+        if group_by:
+            point["counts"] = dict(split[b])
+        series.append(point)
+    return {"granularity": granularity, "group_by": group_by, "start": start.isoformat(),
+            "end": end.isoformat(), "series": series}
+
+
+def _lock_for_rebuild(session: Session):
+    # Postgres: tracking() upserts wait on the table lock (and rebuild waits for those
+    # already applied to commit). SQLite: take the write lock up front; writers queue behind
+    if engine.dialect.name == "postgresql":
+        session.execute(text("LOCK TABLE stats_counter, daily_rollup IN SHARE ROW EXCLUSIVE MODE"))
+    elif engine.dialect.name == "sqlite":
+        session.execute(text("BEGIN IMMEDIATE"))
+
+
+def _migrate_rollup():
+    # Derived data: a daily_rollup from before the `lead` key column is dropped and recreated
+    inspector = inspect(engine)
+    if not inspector.has_table(DailyRollup.__tablename__):
+        return
+    if "lead" not in inspector.get_pk_constraint(DailyRollup.__tablename__)["constrained_columns"]:
+        print("Recreating daily_rollup with the per-agency key")
+        DailyRollup.__table__.drop(engine)
+        DailyRollup.__table__.create(engine)
+
+
+def rebuild():
+    _migrate_rollup()
+    with Session(engine) as session:
+        _lock_for_rebuild(session)
+        rollup = _visible_rollup(session)
+        counts = _project(rollup)
+        rows = _by_agency(rollup)
+        stored_counts = {(c.impact_rating, c.sector, c.agency): c.count
+                         for c in session.exec(select(StatsCounter).where(StatsCounter.count != 0)).all()}
+        stored_rows = {(r.day, r.impact_rating, r.sector, r.agency, r.source, r.lead): r.count
+                       for r in session.exec(select(DailyRollup).where(DailyRollup.count != 0)).all()}
+        if stored_counts == dict(counts) and stored_rows == dict(rows):
+            # Nothing drifted: keep the rows and the cached /stats responses
+            session.rollback()
+            print(f"Stats unchanged: {len(counts)} counters, {len(rows)} daily rollups, {sum(counts.values())} items")
+            return
+        session.exec(delete(StatsCounter))
+        session.exec(delete(DailyRollup))
+        session.add_all(StatsCounter(impact_rating=i, sector=s, agency=a, count=n) for (i, s, a), n in counts.items())
+        session.add_all(DailyRollup(day=d, impact_rating=i, sector=s, agency=a, source=src, lead=lead, count=n)
+                        for (d, i, s, a, src, lead), n in rows.items())
+        data_version.bump(session, "stats")
+        session.commit()
+    print(f"Stats rebuilt: {len(counts)} counters, {len(rows)} daily rollups, {sum(counts.values())} items")
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,91 @@
+"""
+Story Clusters.
+Cross-source coverage of one story as rows instead of dicts appended to the
+NewsItem.related_sources JSON column:
+1. story_cluster: one row per story with its canonical (visible) item and member_count
+2. story_cluster_member: one row per item of the story, canonical included
+3. near_dup adds members as duplicates arrive; /news gets member counts with one join
+Run `python story_clusters.py` to import legacy related_sources lists.
+"""
+from datetime import datetime
+from typing import List
+
+from sqlmodel import Session, select, delete, update, func
+
+from database import engine
+from models import NewsItem, StoryCluster, StoryClusterMember
+import url_canon
+
+
+def _cluster_for(session: Session, canonical_id: int) -> StoryCluster:
+    member = session.get(StoryClusterMember, canonical_id)
+    if member:
+        return session.get(StoryCluster, member.cluster_id)
+    cluster = StoryCluster(canonical_item_id=canonical_id)
+    session.add(cluster)
+    session.flush()
+    session.add(StoryClusterMember(item_id=canonical_id, cluster_id=cluster.id))
+    return cluster
+
+
+def add_member(session: Session, canonical_id: int, item_id: int) -> StoryCluster:
+    """
+    Puts item_id into the story of canonical_id (in the caller's transaction).
+    If item_id already had its own cluster (e.g. a former canonical), the two are merged.
+    """
+    cluster = _cluster_for(session, canonical_id)
+    existing = session.get(StoryClusterMember, item_id)
+    if existing is None:
+        session.add(StoryClusterMember(item_id=item_id, cluster_id=cluster.id))
+    elif existing.cluster_id != cluster.id:
+        old_id = existing.cluster_id
+        session.exec(update(StoryClusterMember).where(StoryClusterMember.cluster_id == old_id).values(cluster_id=cluster.id))
+        session.exec(delete(StoryCluster).where(StoryCluster.id == old_id))
+    session.flush()
+
+    # Indexed count of this cluster only
+    count = select(func.count()).select_from(StoryClusterMember).where(StoryClusterMember.cluster_id == cluster.id)
+    session.exec(update(StoryCluster).where(StoryCluster.id == cluster.id)
+                 .values(member_count=count.scalar_subquery(), updated_at=datetime.utcnow()))
+    return cluster
+
+
+def sources_for(session: Session, item_id: int) -> List[dict]:
+    """The other items of item_id's story ("also seen on"), oldest first."""
+    member = session.get(StoryClusterMember, item_id)
+    if member is None:
+        return []
+    rows = session.exec(
+        select(NewsItem.id, NewsItem.source, NewsItem.url, NewsItem.published_at)
+        .join(StoryClusterMember, StoryClusterMember.item_id == NewsItem.id)
+        .where(StoryClusterMember.cluster_id == member.cluster_id, NewsItem.id != item_id)
+        .order_by(NewsItem.published_at)
+    ).all()
+    return [{"id": r.id, "source": r.source, "url": r.url, "date": r.published_at} for r in rows]
+
+
+def import_related_sources():
+    """One-off: turn legacy related_sources lists into cluster members, then clear them."""
+    with Session(engine) as session:
+        rows = session.exec(select(NewsItem.id, NewsItem.related_sources)).all()
+        imported = missing = 0
+        for item_id, sources in rows:
+            if not sources:
+                continue
+            for source in sources:
+                url = source.get("url")
+                match = session.exec(
+                    select(NewsItem.id).where(NewsItem.url_hash == url_canon.url_hash(url))
+                ).first() if url else None
+                if match is None or match == item_id:
+                    missing += 1
+                    continue
+                add_member(session, item_id, match)
+                imported += 1
+            session.exec(update(NewsItem).where(NewsItem.id == item_id).values(related_sources=None))
+        session.commit()
+    print(f"Imported {imported} related sources into story clusters ({missing} without a stored item)")
+
+
+if __name__ == "__main__":
+    import_related_sources()
@@ -0,0 +1,308 @@
+"""
+URL Canonicalizer.
+The same article reaches us as an ST/CNA RSS link and as a news.google.com
+redirect from backfill / personalized queries, plus http/https, www., trailing
+slash and tracking-parameter variants.
+1. canonical_url(): strips tracking params and resolves Google News article
+   links to the publisher URL (offline decode first, network only if needed)
+2. Resolutions are cached in the `urlalias` table, so a redirect is resolved
+   once, not on every run
+3. url_hash(): fixed-width hash of the normalized canonical URL, stored in
+   NewsItem.url_hash under a unique index (every dedup check is one lookup)
+4. A link that couldn't be resolved is stored under its stripped Google URL. When
+   it resolves later (a scan meets it again, or retry_failed() on the hourly
+   scheduler), the item is re-keyed to the publisher URL, so a direct ST/CNA copy
+   still finds it
+Run `python url_canon.py` to re-key items stored before canonicalization.
+"""
+import base64
+import hashlib
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+from bs4 import BeautifulSoup
+from sqlmodel import Session, select
+
+from database import engine
+from feed_fetcher import USER_AGENT
+from models import NewsItem, UrlAlias
+import data_version
+
+HASH_CHARS = 32 # Width of NewsItem.url_hash
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "ocid", "cmpid",
+    "ref", "ref_src", "s_cid", "at_medium", "at_campaign", "spm", "oc", "guccounter",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+GOOGLE_NEWS_HOST = "news.google.com"
+GOOGLE_ARTICLE_PATH = re.compile(r"/(?:rss/)?(?:articles|read)/([A-Za-z0-9_-]+)")
+BATCH_EXECUTE_URL = "https://news.google.com/_/DotsSplashUi/data/batchexecute"
+
+RESOLVE_TIMEOUT = 8.0
+RESOLVE_WORKERS = 4
+RETRY_FAILED_AFTER = timedelta(days=1)
+
+
+def strip_tracking(url: str) -> str:
+    """Drops utm_* / fbclid / Google "oc" etc. and the #fragment; keeps other params in order."""
+    parts = urlsplit((url or "").strip())
+    # Filter the raw "k=v" segments so the remaining params keep their exact encoding
+    query = [seg for seg in parts.query.split("&") if seg and not _is_tracking(seg.split("=", 1)[0])]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, "&".join(query), ""))
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def normalize_url(url: str) -> str:
+    """Scheme-less, lowercase host without www., no tracking params / fragment / trailing slash."""
+    parts = urlsplit(strip_tracking(url))
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+    path = parts.path.rstrip("/")
+    key = host + path
+    if parts.query:
+        key += "?" + parts.query
+    return key
+
+
+def url_hash(url: str) -> str:
+    """Pass the canonical URL (canonical_url) so redirect links hash like their target."""
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()[:HASH_CHARS]
+
+
+# --- Google News redirects ---
+
+def is_google_news(url: str) -> bool:
+    return urlsplit(url or "").netloc.lower() == GOOGLE_NEWS_HOST and bool(GOOGLE_ARTICLE_PATH.search(url))
+
+
+def _article_id(url: str) -> Optional[str]:
+    match = GOOGLE_ARTICLE_PATH.search(urlsplit(url).path)
+    return match.group(1) if match else None
+
+
+def decode_google_news(url: str) -> Optional[str]:
+    """
+    Older article IDs are base64 protobufs with the target URL inside
+    (0x08 0x13 0x22 <varint length> <url>). Newer "AU_yqL..." IDs need the network.
+    """
+    article_id = _article_id(url)
+    if not article_id:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(article_id + "=" * (-len(article_id) % 4))
+    except Exception:
+        return None
+    if not raw.startswith(b"\x08\x13\x22"):
+        return None
+    pos, length, shift = 3, 0, 0
+    while pos < len(raw):
+        byte = raw[pos]
+        pos += 1
+        length |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            break
+    target = raw[pos:pos + length]
+    if target.startswith(b"http"):
+        return target.decode("utf-8", "ignore")
+    return None
+
+
+def resolve_google_news(url: str, client: httpx.Client) -> Optional[str]:
+    """Asks Google for the target of a new-style article ID (article page signature + batchexecute)."""
+    article_id = _article_id(url)
+    if not article_id:
+        return None
+    try:
+        page = client.get(f"https://{GOOGLE_NEWS_HOST}/articles/{article_id}")
+        page.raise_for_status()
+        node = BeautifulSoup(page.text, "lxml").select_one("c-wiz > div[jscontroller]")
+        if node is None:
+            return None
+        signature, timestamp = node.get("data-n-a-sg"), node.get("data-n-a-ts")
+        if not signature or not timestamp:
+            return None
+        request = [
+            "Fbv4je",
+            f'["garturlreq",[["X","X",["X","X"],null,null,1,1,"US:en",null,1,null,null,null,null,null,0,1],'
+            f'"X","X",1,[1,1,1],1,1,null,0,0,null,0],"{article_id}",{timestamp},"{signature}"]',
+        ]
+        response = client.post(
+            BATCH_EXECUTE_URL,
+            data={"f.req": json.dumps([[request]])},
+            headers={"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"},
+        )
+        response.raise_for_status()
+        payload = json.loads(response.text.split("\n\n", 1)[1])[:-2]
+        target = json.loads(payload[0][2])[1]
+        return target if isinstance(target, str) and target.startswith("http") else None
+    except Exception as e:
+        print(f"  [Canon] Could not resolve {url[:80]}: {e}")
+        return None
+
+
+# --- Cache + public API ---
+
+def _source_key(url: str) -> str:
+    return hashlib.sha256(strip_tracking(url).encode("utf-8")).hexdigest()[:HASH_CHARS]
+
+
+def canonicalize_many(urls: Iterable[str], resolve: bool = True) -> Dict[str, str]:
+    """
+    {url: canonical URL}. Google News links are looked up in the alias cache, decoded
+    offline where possible, and otherwise resolved over the network (concurrently,
+    at most once per link; failures are retried after RETRY_FAILED_AFTER).
+    Unresolvable links fall back to the stripped Google URL; with resolve=False they
+    are recorded as due for retry_failed() instead of being looked up now.
+    """
+    urls = list(dict.fromkeys(u for u in urls if u))
+    result = {u: strip_tracking(u) for u in urls}
+    google = [u for u in urls if is_google_news(u)]
+    if not google:
+        return result
+
+    keys = {u: _source_key(u) for u in google}
+    try:
+        with Session(engine) as session:
+            cached = {row.source_hash: row for row in session.exec(
+                select(UrlAlias).where(UrlAlias.source_hash.in_(list(set(keys.values()))))).all()}
+    except Exception as e:
+        print(f"URL alias cache unavailable: {e}")
+        cached = {}
+
+    now = datetime.utcnow()
+    todo = []
+    for u in google:
+        row = cached.get(keys[u])
+        if row and (row.canonical_url or now - row.resolved_at < RETRY_FAILED_AFTER):
+            if row.canonical_url:
+                result[u] = strip_tracking(row.canonical_url)
+            continue
+        todo.append(u)
+
+    resolved: Dict[str, Optional[str]] = {}
+    network = []
+    for u in todo:
+        target = decode_google_news(u)
+        if target:
+            resolved[u] = target
+        else:
+            network.append(u)
+    deferred: Dict[str, str] = {}
+    if network and resolve:
+        with httpx.Client(headers={"User-Agent": USER_AGENT}, timeout=RESOLVE_TIMEOUT, follow_redirects=True) as client:
+            with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as pool:
+                for u, target in zip(network, pool.map(lambda x: resolve_google_news(x, client), network)):
+                    resolved[u] = target
+    elif network:
+        deferred = {keys[u]: u for u in network if keys[u] not in cached}
+    if not resolved and not deferred:
+        return result
+
+    for u, target in resolved.items():
+        if target:
+            result[u] = strip_tracking(target)
+    try:
+        with Session(engine) as session:
+            for u, target in resolved.items():
+                row = session.get(UrlAlias, keys[u]) or UrlAlias(source_hash=keys[u], source_url=u)
+                row.canonical_url = target
+                row.resolved_at = now
+                session.add(row)
+            for key, u in deferred.items():
+                session.add(UrlAlias(source_hash=key, source_url=u, resolved_at=now - RETRY_FAILED_AFTER))
+            _rekey(session, {u: target for u, target in resolved.items() if target})
+            session.commit()
+    except Exception as e:
+        print(f"Could not save URL aliases: {e}")
+    return result
+
+
+def canonical_url(url: str, resolve: bool = True) -> str:
+    return canonicalize_many([url], resolve).get(url, url)
+
+
+def _rekey(session: Session, targets: Dict[str, str]) -> int:
+    """Moves items stored under a Google link's fallback hash to its resolved target (caller commits)."""
+    moves = {url_hash(strip_tracking(u)): strip_tracking(t) for u, t in targets.items()}
+    if not moves:
+        return 0
+    items = session.exec(select(NewsItem).where(NewsItem.url_hash.in_(list(moves)))).all()
+    if not items:
+        return 0
+    new_hashes = [url_hash(moves[item.url_hash]) for item in items]
+    taken = set(session.exec(select(NewsItem.url_hash).where(NewsItem.url_hash.in_(new_hashes))).all())
+    changed = 0
+    for item in items:
+        new_url = moves[item.url_hash]
+        new_hash = url_hash(new_url)
+        if new_hash in taken:
+            print(f"  [Duplicate] #{item.id} {item.url[:60]} -> {new_url[:60]}")
+            continue
+        item.url, item.url_hash = new_url, new_hash
+        session.add(item)
+        taken.add(new_hash)
+        changed += 1
+    if changed:
+        data_version.bump(session)
+        print(f"  [Canon] Re-keyed {changed} items to their resolved URLs")
+    return changed
+
+
+def retry_failed(limit: int = 200) -> int:
+    """Retries aliases that failed (or were deferred) and are due; their items are re-keyed. Runs hourly."""
+    cutoff = datetime.utcnow() - RETRY_FAILED_AFTER
+    with Session(engine) as session:
+        urls = session.exec(
+            select(UrlAlias.source_url).where(UrlAlias.canonical_url == None, UrlAlias.resolved_at <= cutoff)
+            .order_by(UrlAlias.resolved_at).limit(limit)
+        ).all()
+    if urls:
+        canonicalize_many(urls)
+    return len(urls)
+
+
+def rekey_items(batch_size: int = 200):
+    """One-off: canonicalize stored URLs (e.g. old Google News links) and re-hash them."""
+    with Session(engine) as session:
+        rows = session.exec(select(NewsItem.id, NewsItem.url, NewsItem.url_hash)).all()
+        taken = {row.url_hash for row in rows if row.url_hash}
+        changed = collisions = 0
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            canon = canonicalize_many([row.url for row in chunk])
+            for row in chunk:
+                new_url = canon.get(row.url, row.url)
+                new_hash = url_hash(new_url)
+                if new_url == row.url and new_hash == row.url_hash:
+                    continue
+                if new_hash != row.url_hash and new_hash in taken:
+                    collisions += 1 # Same article already stored under its canonical URL
+                    print(f"  [Duplicate] #{row.id} {row.url[:60]} -> {new_url[:60]}")
+                    continue
+                item = session.get(NewsItem, row.id)
+                item.url, item.url_hash = new_url, new_hash
+                session.add(item)
+                taken.discard(row.url_hash)
+                taken.add(new_hash)
+                changed += 1
+            session.commit()
+    print(f"Re-keyed {changed} items, {collisions} duplicates left as-is (see deduplicate_existing.py)")
+
+
+if __name__ == "__main__":
+    rekey_items()
@@ -23,20 +23,28 @@ def index_items(items: List[NewsItem]):
     """
     if not items:
         return
+    index_ids([item.id for item in items])
+
+def index_ids(item_ids: List[int]) -> int:
+    """
+    Generate and save embeddings for items by ID. Returns number embedded.
+    """
+    if not item_ids:
+        return 0
         
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         print("Skipping embedding generation: No API Key")
-        return
+        return 0
 
     # Create local session to update artifacts
     from database import engine
     with Session(engine) as session:
         count = 0
-        for item in items:
+        for item_id in item_ids:
             try:
                 # Re-fetch to attach to session
-                db_item = session.get(NewsItem, item.id)
+                db_item = session.get(NewsItem, item_id)
                 if not db_item: 
                     continue
                 
@@ -48,11 +56,12 @@ def index_items(items: List[NewsItem]):
                          session.add(db_item)
                          count += 1
             except Exception as e:
-                print(f"Error embedding item {item.id}: {e}")
+                print(f"Error embedding item {item_id}: {e}")
         
         if count > 0:
             session.commit()
             print(f"✅ Generated embeddings for {count} new items.")
+        return count
 
 def load_rejected_embeddings():
     pass
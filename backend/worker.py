@@ -0,0 +1,106 @@
+"""
+Scrape Worker.
+Runs queued jobs (jobs.py) outside the web process, so feed parsing and
+classification don't compete with API requests for the GIL:
+1. Claims the oldest queued job, runs its handler, stores the result
+2. A heartbeat thread keeps the claim alive while a long scan runs and
+   publishes the handler's progress dict (GET /scan/status)
+3. Several workers can run side by side; each job is claimed exactly once
+Start with `python worker.py` (Procfile: worker). For single-process setups the
+API can run the same loop in a thread (EMBEDDED_WORKER=1, the default).
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from database import create_db_and_tables
+import ingest
+import jobs
+import scan_coordinator # Registers the scrape job's pending key for requeue_stale()
+import scrape_runs
+import seen_filter
+
+POLL_INTERVAL = 5.0       # Seconds between queue checks when idle
+HEARTBEAT_INTERVAL = 5.0 # Also how often progress is published
+PRUNE_EVERY = 3600.0
+
+
+def scrape(full_backfill: bool = False, trigger: str = "scheduled", sources: Optional[List[str]] = None,
+           progress: Optional[Dict] = None) -> Dict:
+    print("Running scheduled scrape..." if not sources else f"Running scrape of {', '.join(sources)}...")
+    # Streaming pipeline: items are written and embedded while feeds are still in flight
+    on_progress = (lambda r: progress.update(r.progress())) if progress is not None else None
+    result = ingest.run_scan(full_backfill, sources, on_progress)
+    stats = result.fetch_stats
+    run_id = scrape_runs.record(result, trigger, full_backfill)
+    print(f"Scraped {result.scraped} items. Added {result.added} ({result.merged} merged as duplicates), Updated {result.updated}, "
+          f"Embedded {result.embedded}. Skipped {stats.get('feeds_unchanged', 0)}/{stats.get('feeds', 0)} unchanged feeds. Run #{run_id}")
+    return {"run_id": run_id, "scraped": result.scraped, "added": result.added, "updated": result.updated,
+            "errors": result.errors}
+
+
+# kind -> handler(**job.params, progress=dict); the handler keeps `progress` current
+HANDLERS: Dict[str, Callable[..., Dict]] = {
+    "scrape": scrape,
+}
+
+
+def run_job(job) -> None:
+    handler = HANDLERS.get(job.kind)
+    if handler is None:
+        jobs.finish(job.id, error=f"unknown job kind {job.kind!r}")
+        return
+
+    done = threading.Event()
+    progress: Dict = {}
+
+    def beat():
+        while not done.wait(HEARTBEAT_INTERVAL):
+            try:
+                jobs.heartbeat(job.id, dict(progress))
+            except Exception as e:
+                print(f"[Worker] Heartbeat failed for job #{job.id}: {e}")
+
+    threading.Thread(target=beat, name=f"job-{job.id}-heartbeat", daemon=True).start()
+    print(f"[Worker] Job #{job.id} ({job.kind}) started, attempt {job.attempts}")
+    try:
+        result = handler(**(job.params or {}), progress=progress)
+        jobs.finish(job.id, result)
+    except Exception as e:
+        print(f"[Worker] Job #{job.id} failed: {e}")
+        jobs.finish(job.id, error=str(e))
+    finally:
+        done.set()
+
+
+def run_forever(stop: Optional[threading.Event] = None, worker: Optional[str] = None):
+    stop = stop or threading.Event()
+    worker = worker or jobs.worker_id()
+    last_prune = 0.0
+    print(f"[Worker] {worker} polling for jobs")
+    while not stop.is_set():
+        try:
+            if time.monotonic() - last_prune > PRUNE_EVERY:
+                jobs.prune()
+                last_prune = time.monotonic()
+            job = jobs.claim(worker)
+        except Exception as e:
+            print(f"[Worker] Could not claim a job: {e}")
+            job = None
+        if job is None:
+            stop.wait(POLL_INTERVAL)
+            continue
+        run_job(job)
+
+
+def start_embedded() -> threading.Event:
+    """Runs the worker loop in a daemon thread of the current process; set the returned event to stop it."""
+    stop = threading.Event()
+    threading.Thread(target=run_forever, args=(stop,), name="embedded-worker", daemon=True).start()
+    return stop
+
+
+if __name__ == "__main__":
+    create_db_and_tables()
+    seen_filter.load()
+    run_forever()
@@ -21,6 +21,8 @@ function App() {
   const [searchQuery, setSearchQuery] = useState("");
   const [isSearchActive, setIsSearchActive] = useState(false);
   const [trigger, setTrigger] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null); // X-Next-Cursor of the last /news page
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Initial Fetch & Reactive Updates
   useEffect(() => {
@@ -38,23 +40,26 @@ function App() {
     return () => clearInterval(interval);
   }, [isSearchActive]);
 
+  const newsParams = () => {
+    const params = {};
+    if (selectedSector) params.sector = selectedSector;
+    if (selectedAgency) params.agency = selectedAgency;
+    return params;
+  };
+
   const fetchNews = async () => {
     setLoading(true);
     try {
-      const params = {};
-      if (selectedSector) params.sector = selectedSector;
-      if (selectedAgency) params.agency = selectedAgency;
-
-      const res = await axios.get(`${API_Base}/news`, { params });
+      // First page only; older items are fetched with loadMoreNews
+      const res = await axios.get(`${API_Base}/news`, { params: newsParams() });
       let data = res.data;
       if (Array.isArray(data)) {
-        if (selectedAgency) {
-          data = data.filter(item => item.agency === selectedAgency);
-        }
         setNews(data);
         setOriginalNews(data); // Sync backup
+        setNextCursor(res.headers['x-next-cursor'] || null);
       } else {
         setNews([]);
+        setNextCursor(null);
       }
     } catch (err) {
       console.error("Failed to fetch news", err);
@@ -63,6 +68,23 @@ function App() {
     }
   };
 
+  const loadMoreNews = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const res = await axios.get(`${API_Base}/news`, { params: { ...newsParams(), cursor: nextCursor } });
+      if (Array.isArray(res.data)) {
+        setNews(prev => [...prev, ...res.data]);
+        setOriginalNews(prev => [...prev, ...res.data]);
+      }
+      setNextCursor(res.headers['x-next-cursor'] || null);
+    } catch (err) {
+      console.error("Failed to load more news", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Watch for empty search query to auto-restore
   useEffect(() => {
     if ((!searchQuery || searchQuery.trim() === "") && isSearchActive) {
@@ -183,8 +205,8 @@ function App() {
   // Local Filter logic (Only applies if NOT in Smart Search mode, or applies on top?)
   const displayNews = isSearchActive ? news : news.filter(item => {
     // Standard Filtering
+    // (agency is filtered server-side via /news?agency=)
     if (selectedSector && item.sector !== selectedSector) return false;
-    if (selectedAgency && item.agency && !item.agency.includes(selectedAgency)) return false;
     return true;
   });
 
@@ -295,7 +317,8 @@ function App() {
                 {searchLoading ? "AI Scout is searching historical archives..." :
                   loading ? "Scanning sources..." :
                     isSearchActive && displayNews.length === 0 ? "No results found." :
-                      `${displayNews.length} updates found`}
+                      !isSearchActive && nextCursor ? `Showing the latest ${displayNews.length} updates` :
+                        `${displayNews.length} updates found`}
               </p>
             </header>
 
@@ -321,6 +344,19 @@ function App() {
               </div>
             )}
 
+            {!isSearchActive && nextCursor && displayNews.length > 0 && (
+              <div className="flex justify-center pb-10">
+                <button
+                  onClick={loadMoreNews}
+                  disabled={loadingMore}
+                  className="flex items-center gap-2 bg-white/5 hover:bg-white/10 text-gray-300 px-4 py-2 rounded-xl border border-white/10 font-medium text-sm transition-all shadow-sm disabled:opacity-50"
+                >
+                  {loadingMore && <Loader size={16} className="animate-spin" />}
+                  {loadingMore ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
+
             {searchLoading && (
               <div className="absolute inset-0 flex items-center justify-center bg-black/20 backdrop-blur-sm z-50">
                 <div className="bg-gray-900 border border-white/10 p-6 rounded-2xl flex flex-col items-center shadow-2xl">
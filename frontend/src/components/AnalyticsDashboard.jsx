@@ -8,11 +8,14 @@ import { FileText, Download, X, Info, Filter } from 'lucide-react';
 import ReactMarkdown from 'react-markdown';
 import API_BASE_URL from '../config';
 
+const TREND_WEEKS = 12;
+
 export default function AnalyticsDashboard() {
     const [data, setData] = useState(null);
     const [globalData, setGlobalData] = useState(null); // For Pie Chart Context
     const [loading, setLoading] = useState(true);
     const [impactFilter, setImpactFilter] = useState('All');
+    const [trend, setTrend] = useState([]); // Weekly volume, from /stats/timeseries
 
     useEffect(() => {
         fetchStats();
@@ -44,6 +47,20 @@ export default function AnalyticsDashboard() {
         } finally {
             setLoading(false);
         }
+        fetchTrend();
+    };
+
+    const fetchTrend = async () => {
+        try {
+            const API = API_BASE_URL;
+            const start = new Date(Date.now() - TREND_WEEKS * 7 * 86400000).toISOString().slice(0, 10);
+            const res = await fetch(`${API}/stats/timeseries?granularity=week&group_by=impact_rating&start=${start}&impact=${impactFilter}`);
+            const json = await res.json();
+            // Flatten {bucket, counts: {High: n}} into rows Recharts can stack
+            setTrend((json.series || []).map(point => ({ bucket: point.bucket.slice(5), ...point.counts })));
+        } catch (e) {
+            console.error("Trend fetch failed", e);
+        }
     };
 
     if (loading || !data || !globalData) return <div className="p-10 text-center text-gray-500">Loading Analytics...</div>;
@@ -216,6 +233,25 @@ export default function AnalyticsDashboard() {
                     </ResponsiveContainer>
                 </div>
             </div>
+
+            {/* Weekly Trend - Stacked by Impact */}
+            <div className="bg-gray-900/50 border border-gray-800 rounded-2xl p-6 h-[350px]">
+                <h3 className="text-lg font-semibold text-gray-200 mb-6">Weekly Trend (Last {TREND_WEEKS} Weeks)</h3>
+                <ResponsiveContainer width="100%" height="85%">
+                    <BarChart data={trend}>
+                        <XAxis dataKey="bucket" tick={{ fill: '#9ca3af' }} />
+                        <YAxis allowDecimals={false} tick={{ fill: '#9ca3af' }} />
+                        <Tooltip
+                            cursor={{ fill: 'rgba(255,255,255,0.05)' }}
+                            contentStyle={{ backgroundColor: '#111827', borderColor: '#374151', color: '#fff' }}
+                        />
+                        <Legend />
+                        {['High', 'Medium', 'Low'].map(level => (
+                            <Bar key={level} dataKey={level} stackId="impact" fill={COLORS[level]} />
+                        ))}
+                    </BarChart>
+                </ResponsiveContainer>
+            </div>
         </div>
     );
 }